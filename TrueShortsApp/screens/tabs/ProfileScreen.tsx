@@ -63,7 +63,7 @@ export default function ProfileScreen() {
           }}>
             <View style={styles.articleCard}>
               <Text style={styles.articleTitle}>{item.title}</Text>
-              <Text numberOfLines={2} style={styles.articleContent}>{item.content}</Text>
+              <Text numberOfLines={2} style={styles.articleContent}>{item.preview}</Text>
             </View>
           </TouchableOpacity>
         )}
@@ -79,7 +79,7 @@ export async function getNews(token: string) {
     return { detail: 'Not authenticated' };
   }
   try {
-    const response = await axios.get(`${API_BASE}/news`, {
+    const response = await axios.get(`${API_BASE}/news?include=content`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     return response.data;
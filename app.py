@@ -1,9 +1,17 @@
+from utils.startup import startup  # first, so the startup report times every import below
+import asyncio
+import time
 from fastapi import FastAPI, Request
-from endpoints import auth, news, fake_news
-from tasks.background import scheduler, start_background_verification
+from endpoints import auth, news, fake_news, health, profiles
+from tasks.warmup import warmup
 from dotenv import load_dotenv
-from utils.database import update_last_active
+from utils.heartbeat import heartbeat
+from utils.leader import leader
+from services.read_buffer import read_buffer
+from utils.metrics import HTTP_SECONDS, HTTP_IN_FLIGHT
+from utils import profiling
 load_dotenv()
+startup.mark("imports")
 openapi_tags = [
     {
         "name": "News Aggregation and Personalization"    }
@@ -16,14 +24,44 @@ app = FastAPI(
 
 @app.middleware("http")
 async def update_heartbeat_middleware(request: Request, call_next):
-    update_last_active()
-    response = await call_next(request)
-    return response
+    # In-memory only; the heartbeat task flushes it to Mongo periodically
+    heartbeat.touch()
+    start = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        if profiling.should_profile_request(request):
+            async with profiling.profile(f"{request.method} {request.url.path}") as stored:
+                response = await call_next(request)
+            # Streaming bodies are produced after this point and are not covered
+            if stored["id"]:
+                response.headers["X-Profile-Id"] = stored["id"]
+        else:
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        # Label by route template, not the raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        HTTP_SECONDS.labels(request.method, getattr(route, "path", "unmatched"), str(status)).observe(time.perf_counter() - start)
 
 app.include_router(auth.router, tags=["News Aggregation and Personalization"])
 app.include_router(news.router, tags=["News Aggregation and Personalization"])
 app.include_router(fake_news.router, tags=["News Aggregation and Personalization"])
+app.include_router(health.router, tags=["Health"])
+app.include_router(profiles.router, tags=["Health"])
 
 @app.on_event("startup")
 async def startup_event():
-    await start_background_verification()
+    heartbeat.start()
+    read_buffer.start()
+    # Serve health checks right away; /readyz flips once warmup has finished
+    app.state.warmup_task = asyncio.create_task(warmup())
+    startup.mark("app_startup")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await leader.stop()
+    await read_buffer.stop()
+    await heartbeat.stop()
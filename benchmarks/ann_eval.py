@@ -0,0 +1,176 @@
+"""Offline recall/latency evaluation of FAISS index configurations.
+
+Usage: python -m benchmarks.ann_eval [--index faiss_indexes/global.index | --synthetic 20000] [--output ann_report.json]
+
+Vectors come from an existing index file (HNSW flat storage is reconstructed)
+or from synthetic clustered, normalized 384-d data shaped like MiniLM
+embeddings. Held-out queries are searched with exact IndexFlatL2 as ground
+truth, then with every HNSW (M x efSearch) and IVF (nlist x nprobe)
+configuration, reporting recall@k, single-query latency percentiles, build
+time and serialized size. Near-duplicate queries are used to show how the
+is_similar threshold separates duplicates from unrelated articles.
+"""
+import argparse
+import json
+import os
+import time
+import faiss
+import numpy as np
+from services.recommender import SIMILARITY_THRESHOLD
+
+DIM = 384
+
+def _ints(value):
+    return [int(v) for v in value.split(",") if v]
+
+def _floats(value):
+    return [float(v) for v in value.split(",") if v]
+
+def load_vectors(path: str) -> np.ndarray:
+    index = faiss.read_index(path)
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    storage = faiss.downcast_index(inner.storage) if hasattr(inner, "storage") else inner
+    return storage.reconstruct_n(0, storage.ntotal).astype(np.float32)
+
+def synthetic_vectors(n: int, clusters: int = 50, spread: float = 0.35, seed: int = 0) -> np.ndarray:
+    """Normalized vectors around random topic centres, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def split(vectors: np.ndarray, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(vectors))
+    return vectors[order[queries:]], vectors[order[:queries]]
+
+def near_duplicates(base: np.ndarray, count: int, noise: float, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    picked = base[rng.integers(0, len(base), count)]
+    dupes = picked + noise * rng.standard_normal(picked.shape).astype(np.float32) / np.sqrt(DIM)
+    return dupes / np.linalg.norm(dupes, axis=1, keepdims=True)
+
+def percentiles(seconds) -> dict:
+    ms = np.asarray(seconds) * 1000
+    return {"mean": float(ms.mean()), **{f"p{p}": float(np.percentile(ms, p)) for p in (50, 95, 99)}}
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray, k: int) -> float:
+    hits = sum(len(set(f[:k]) & set(t[:k]) - {-1}) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+    start = time.perf_counter()
+    index.search(queries, k)
+    batch = time.perf_counter() - start
+    return {
+        "recall_at_k": recall_at_k(np.asarray(found), truth, k),
+        "latency_ms": percentiles(latencies),
+        "batch_qps": len(queries) / batch if batch else None,
+    }
+
+def build(factory, base: np.ndarray):
+    start = time.perf_counter()
+    index = factory()
+    if not index.is_trained:
+        index.train(base)
+    index.add(base)
+    return index, time.perf_counter() - start, faiss.serialize_index(index).nbytes
+
+def evaluate_thresholds(base, dupes, unrelated, thresholds) -> dict:
+    """Nearest-neighbour distances (squared L2, as stored) and how each threshold classifies them."""
+    exact = faiss.IndexFlatL2(DIM)
+    exact.add(base)
+    d_dupe = exact.search(dupes, 1)[0][:, 0]
+    d_unrelated = exact.search(unrelated, 1)[0][:, 0]
+    return {
+        "distance_percentiles": {
+            "near_duplicate": {f"p{p}": float(np.percentile(d_dupe, p)) for p in (5, 50, 95)},
+            "unrelated": {f"p{p}": float(np.percentile(d_unrelated, p)) for p in (5, 50, 95)},
+        },
+        # is_similar() reports a match when the distance is >= the threshold
+        "is_similar_rate": {
+            str(t): {"near_duplicate": float((d_dupe >= t).mean()), "unrelated": float((d_unrelated >= t).mean())}
+            for t in thresholds
+        },
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--index", help="existing .index file to take vectors from (default faiss_indexes/global.index)")
+    source.add_argument("--synthetic", type=int, help="number of synthetic vectors to generate")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=_ints, default=[16, 32, 48], help="HNSW M values")
+    parser.add_argument("--ef-construction", type=int, default=40)
+    parser.add_argument("--ef-search", type=_ints, default=[16, 32, 64, 128, 256])
+    parser.add_argument("--nlist", type=_ints, default=None, help="IVF list counts (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=_ints, default=[1, 4, 16, 64])
+    parser.add_argument("--thresholds", type=_floats, default=[0.2, 0.5, SIMILARITY_THRESHOLD, 0.9, 1.2])
+    parser.add_argument("--dupe-noise", type=float, default=0.3, help="noise scale for near-duplicate queries")
+    parser.add_argument("--output", default="ann_report.json")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    path = args.index or os.path.join("faiss_indexes", "global.index")
+    if args.synthetic is None and os.path.exists(path):
+        vectors, source = load_vectors(path), path
+    else:
+        vectors, source = synthetic_vectors(args.synthetic or 20000), "synthetic"
+    if len(vectors) <= args.queries * 2:
+        raise SystemExit(f"{len(vectors)} vectors is too few for {args.queries} queries")
+    base, queries = split(vectors, args.queries)
+    k = min(args.k, len(base))
+
+    exact, exact_build, exact_bytes = build(lambda: faiss.IndexFlatL2(DIM), base)
+    _, truth = exact.search(queries, k)
+    results = [{"index": "Flat (exact)", "build_seconds": exact_build, "bytes": exact_bytes, **measure(exact, queries, truth, k)}]
+    print(f"{len(base)} base vectors from {source}, {len(queries)} queries, k={k}")
+
+    for m in args.m:
+        def hnsw():
+            index = faiss.IndexHNSWFlat(DIM, m)
+            index.hnsw.efConstruction = args.ef_construction
+            return index
+        index, seconds, size = build(hnsw, base)
+        for ef in args.ef_search:
+            index.hnsw.efSearch = ef
+            results.append({"index": f"HNSWFlat M={m} efSearch={ef}", "M": m, "efSearch": ef,
+                            "build_seconds": seconds, "bytes": size, **measure(index, queries, truth, k)})
+
+    for nlist in args.nlist or [max(1, int(4 * np.sqrt(len(base))))]:
+        if nlist > len(base):
+            continue
+        index, seconds, size = build(lambda: faiss.IndexIVFFlat(faiss.IndexFlatL2(DIM), DIM, nlist), base)
+        for nprobe in args.nprobe:
+            if nprobe > nlist:
+                continue
+            index.nprobe = nprobe
+            results.append({"index": f"IVFFlat nlist={nlist} nprobe={nprobe}", "nlist": nlist, "nprobe": nprobe,
+                            "build_seconds": seconds, "bytes": size, **measure(index, queries, truth, k)})
+
+    dupes = near_duplicates(base, args.queries, args.dupe_noise)
+    report = {
+        "source": source,
+        "base_vectors": len(base),
+        "queries": len(queries),
+        "k": k,
+        "results": results,
+        "thresholds": evaluate_thresholds(base, dupes, queries, args.thresholds),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for r in results:
+        print(f"{r['index']:32} recall@{k}={r['recall_at_k']:.3f}  p50={r['latency_ms']['p50']:.3f}ms  "
+              f"p99={r['latency_ms']['p99']:.3f}ms  build={r['build_seconds']:.2f}s  size={r['bytes'] / 2**20:.1f}MiB")
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Local stand-ins for every external HTTP service the backend talks to.
+
+Serves a deterministic fixture corpus so ingest and verification can be
+benchmarked offline:
+
+    /rss/{source}.xml            RSS feed per source
+    /article/{source}/{n}        article HTML linked from the feeds
+    /gnews                       GNews top-headlines JSON
+    /serper                      Serper search JSON (POST)
+    /factcheck                   Google Fact Check claims JSON
+    /wikipedia/w/api.php         Wikipedia search API
+    /wikipedia/wiki/{title}      Wikipedia article HTML
+
+Latency per route group is configurable so slow upstreams can be simulated.
+"""
+import asyncio
+import json
+import random
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from html import escape
+from aiohttp import web
+
+TOPICS = {
+    "election": "vote ballot campaign parliament candidate turnout coalition minister polling constituency",
+    "economy": "inflation market rupee growth budget deficit exports interest bank investors",
+    "climate": "monsoon rainfall heatwave emissions flood drought glacier carbon temperature coast",
+    "cricket": "wicket innings captain series stadium bowler century selectors tournament pitch",
+    "technology": "startup chip satellite software artificial intelligence launch funding telecom data",
+    "health": "hospital vaccine outbreak doctors patients clinic ministry trial disease nutrition",
+    "diplomacy": "summit treaty embassy sanctions delegation border talks ambassador trade accord",
+    "transport": "railway metro airport highway flights commuters bridge freight traffic corridor",
+}
+FILLER = "officials said on the day that reports showed the plan would continue as expected after review".split()
+
+class Corpus:
+    """Deterministic articles; sources overlap on stories so deduplication has work to do."""
+
+    def __init__(self, sources, items_per_feed: int, stories: int, paragraphs: int, seed: int = 7):
+        self.sources = list(sources)
+        self.items_per_feed = items_per_feed
+        self.stories = stories
+        self.paragraphs = paragraphs
+        self.seed = seed
+        self.now = datetime.now(timezone.utc)
+
+    def story_of(self, source: str, n: int) -> int:
+        return (self.sources.index(source) * 7 + n) % self.stories if source in self.sources else n % self.stories
+
+    def topic_of(self, story: int) -> str:
+        return list(TOPICS)[story % len(TOPICS)]
+
+    def title(self, story: int) -> str:
+        return f"{self.topic_of(story).title()} update {story}: {' '.join(TOPICS[self.topic_of(story)].split()[:3])}"
+
+    def body(self, story: int, lead: str = "") -> str:
+        rng = random.Random(self.seed * 100003 + story)
+        words = TOPICS[self.topic_of(story)].split()
+        paragraphs = [lead] if lead else []
+        for _ in range(self.paragraphs):
+            paragraphs.append(" ".join(rng.choice(words if rng.random() < 0.6 else FILLER) for _ in range(60)).capitalize() + ".")
+        return "".join(f"<p>{escape(p)}</p>" for p in paragraphs)
+
+    def claims(self, count: int):
+        return [f"{self.title(i % self.stories)} was confirmed by officials (claim {i})" for i in range(count)]
+
+def _html(title: str, body: str) -> str:
+    return (
+        f"<html><head><title>{escape(title)}</title><script>var x = 1;</script></head>"
+        f"<body><nav>Home | World</nav><article><h1>{escape(title)}</h1>{body}</article>"
+        f"<footer>Fixture corpus</footer></body></html>"
+    )
+
+def build_app(corpus: Corpus, feed_latency: float = 0.0, page_latency: float = 0.0, search_latency: float = 0.0):
+    latencies = {"rss": feed_latency, "gnews": feed_latency, "article": page_latency, "wikipedia": page_latency,
+                 "serper": search_latency, "factcheck": search_latency}
+
+    @web.middleware
+    async def simulate_latency(request, handler):
+        delay = latencies.get(request.path.strip("/").split("/")[0], 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    def base(request) -> str:
+        return f"{request.scheme}://{request.host}"
+
+    async def rss(request):
+        source = request.match_info["source"]
+        items = []
+        for n in range(corpus.items_per_feed):
+            story = corpus.story_of(source, n)
+            published = format_datetime(corpus.now - timedelta(minutes=5 * n))
+            items.append(
+                f"<item><title>{escape(corpus.title(story))}</title>"
+                f"<link>{base(request)}/article/{source}/{n}</link>"
+                f"<category>{corpus.topic_of(story)}</category><pubDate>{published}</pubDate></item>"
+            )
+        xml = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{source}</title>{"".join(items)}</channel></rss>'
+        return web.Response(text=xml, content_type="application/rss+xml")
+
+    async def article(request):
+        source, n = request.match_info["source"], int(request.match_info["n"])
+        story = corpus.story_of(source, n)
+        return web.Response(text=_html(corpus.title(story), corpus.body(story, lead=f"Reported by {source}.")), content_type="text/html")
+
+    async def gnews(request):
+        articles = []
+        for n in range(int(request.query.get("max", corpus.items_per_feed))):
+            story = corpus.story_of("gnews", n)
+            articles.append({
+                "title": corpus.title(story),
+                "url": f"{base(request)}/article/gnews/{n}",
+                "publishedAt": (corpus.now - timedelta(minutes=3 * n)).isoformat(),
+            })
+        return web.json_response({"totalArticles": len(articles), "articles": articles})
+
+    def _claim_story(query: str) -> int:
+        return sum(map(ord, query)) % corpus.stories
+
+    async def serper(request):
+        payload = await request.json()
+        story = _claim_story(payload.get("q", ""))
+        return web.json_response({"organic": [{"link": f"{base(request)}/article/serper/{story + i}"} for i in range(3)]})
+
+    async def factcheck(request):
+        story = _claim_story(request.query.get("query", ""))
+        return web.json_response({"claims": [
+            {"text": corpus.title(story), "claimReview": [{"url": f"{base(request)}/article/factcheck/{story + i}"}]}
+            for i in range(3)
+        ]})
+
+    async def wikipedia_api(request):
+        story = _claim_story(request.query.get("srsearch", ""))
+        results = [{"title": f"{corpus.topic_of(story + i).title()} in India"} for i in range(3)]
+        return web.json_response({"query": {"searchinfo": {"totalhits": 3}, "search": results}})
+
+    async def wikipedia_page(request):
+        title = request.match_info["title"].replace("_", " ")
+        story = _claim_story(title)
+        return web.Response(text=_html(title, corpus.body(story)), content_type="text/html")
+
+    app = web.Application(middlewares=[simulate_latency])
+    app.add_routes([
+        web.get("/rss/{source}.xml", rss),
+        web.get("/article/{source}/{n:\\d+}", article),
+        web.get("/gnews", gnews),
+        web.post("/serper", serper),
+        web.get("/factcheck", factcheck),
+        web.get("/wikipedia/w/api.php", wikipedia_api),
+        web.get("/wikipedia/wiki/{title}", wikipedia_page),
+    ])
+    return app
+
+async def start_fixture_server(corpus: Corpus, host: str = "127.0.0.1", port: int = 0, **latencies):
+    """Start the server in the running loop; returns (runner, base_url)."""
+    runner = web.AppRunner(build_app(corpus, **latencies), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+def service_env(base_url: str, sources) -> dict:
+    """Environment variables that point the backend's Config at the fixture server."""
+    return {
+        "RSS_SOURCES": json.dumps({s: f"{base_url}/rss/{s}.xml" for s in sources}),
+        "GNEWS_URL": f"{base_url}/gnews",
+        "GNEWS_API_KEY": "fixture",
+        "SERPER_URL": f"{base_url}/serper",
+        "SERPER_API_KEY": "fixture",
+        "FACT_CHECK_URL": f"{base_url}/factcheck",
+        "GOOGLE_FACT_CHECK_API_KEY": "fixture",
+        "WIKIPEDIA_URL": f"{base_url}/wikipedia",
+    }
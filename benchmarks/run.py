@@ -0,0 +1,221 @@
+"""Offline end-to-end benchmark of ingest, feed, reads and claim verification.
+
+Usage: python -m benchmarks.run [--users 20] [--mongo-uri mongodb://localhost:27017] [--output bench.json]
+
+Every external service is replaced by benchmarks.fixture_server and the stub
+LLM provider; Mongo should be a local throwaway instance (the --db database is
+dropped before and after the run). Writes throughput and latency percentiles
+per stage as JSON so runs can be compared between commits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from benchmarks.fixture_server import Corpus, start_fixture_server, service_env
+
+STAGES = ("fetch", "ingest", "feed", "page", "read", "verify")
+SOURCES = ("bbc", "aljazeera", "reuters", "ndtv", "thehindu")
+
+class StageTimer:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.wall = 0.0
+
+    async def call(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return await fn(*args)
+        except Exception as e:
+            self.errors += 1
+            logging.getLogger(__name__).warning(f"{self.name} call failed: {e!r}")
+            return None
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    def report(self) -> dict:
+        latencies = np.asarray(self.latencies) * 1000
+        percentiles = {}
+        if len(latencies):
+            percentiles = {
+                "mean": float(latencies.mean()),
+                **{f"p{p}": float(np.percentile(latencies, p)) for p in (50, 90, 95, 99)},
+                "max": float(latencies.max()),
+            }
+        return {
+            "count": len(self.latencies),
+            "errors": self.errors,
+            "wall_seconds": self.wall,
+            "throughput_per_second": len(self.latencies) / self.wall if self.wall else 0.0,
+            "latency_ms": percentiles,
+        }
+
+async def run_stage(timer: StageTimer, jobs, concurrency: int):
+    """Run the job coroutines (each a sequence of timed calls) with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded(job):
+        async with semaphore:
+            return await job
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(guarded(job) for job in jobs))
+    timer.wall = time.perf_counter() - start
+    return results
+
+async def drain_background_tasks():
+    # Feed refreshes scheduled by the stages would otherwise leak into the next one
+    from services.feed_queue import wait_for_refreshes
+    await wait_for_refreshes()
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--feed-requests", type=int, default=10, help="GET /news calls per user")
+    parser.add_argument("--feed-pages", type=int, default=3, help="GET /news/feed pages per user")
+    parser.add_argument("--page-size", type=int, default=10, help="limit of each GET /news/feed page")
+    parser.add_argument("--reads", type=int, default=5, help="tracked reads per user")
+    parser.add_argument("--claims", type=int, default=10)
+    parser.add_argument("--fetch-rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--items-per-feed", type=int, default=20)
+    parser.add_argument("--stories", type=int, default=60, help="distinct stories shared across sources")
+    parser.add_argument("--paragraphs", type=int, default=6)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per stub LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds per Serper/Fact Check call")
+    parser.add_argument("--feed-latency", type=float, default=0.0, help="seconds per RSS/GNews call")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="seconds per article page")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="trueshorts_bench")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma separated subset of {','.join(STAGES)}")
+    parser.add_argument("--output", default="bench.json")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    corpus = Corpus(SOURCES, args.items_per_feed, args.stories, args.paragraphs)
+    runner, base_url = await start_fixture_server(
+        corpus, feed_latency=args.feed_latency, page_latency=args.page_latency, search_latency=args.search_latency
+    )
+    # Config is read at import time, so the backend is imported only after the
+    # environment points every service at the fixtures
+    os.environ.update(service_env(base_url, SOURCES))
+    os.environ.update({
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB_NAME": args.db,
+        "FAISS_INDEX_DIR": tempfile.mkdtemp(prefix="bench_faiss_"),
+        "LLM_PROVIDER": "stub",
+        "LLM_STUB_LATENCY": str(args.llm_latency),
+    })
+    from utils.database import db
+    from services.news_aggregator import fetch_all_articles
+    from services.news_service import deduplicate_articles_for_user, track_user_read
+    from services.feed_queue import pop_next_article, next_feed_page
+    from utils.mongo_helpers import article_projection, parse_fields
+    from services.fake_news_service import handle_claim_verification
+
+    await db.client.drop_database(args.db)
+    await db.create_indexes()
+    result = await db.db.users.insert_many([
+        {"email": f"bench-{i}@example.com", "password": "", "name": f"Bench {i}"} for i in range(args.users)
+    ])
+    users = [str(i) for i in result.inserted_ids]
+    timers = {name: StageTimer(name) for name in stages}
+    feed_ids = {user: [] for user in users}
+    # What GET /news and /news/feed load when no fields are requested
+    projection = article_projection(parse_fields())
+
+    try:
+        if "fetch" in timers:
+            timer = timers["fetch"]
+
+            async def fetch_rounds():
+                for _ in range(args.fetch_rounds):
+                    await timer.call(fetch_all_articles)
+
+            await run_stage(timer, [fetch_rounds()], 1)
+
+        if "ingest" in timers:
+            timer = timers["ingest"]
+            await run_stage(timer, [timer.call(deduplicate_articles_for_user, user) for user in users], args.concurrency)
+            await drain_background_tasks()
+
+        if "feed" in timers:
+            timer = timers["feed"]
+
+            async def browse(user):
+                # One user's requests are sequential, users run concurrently
+                for _ in range(args.feed_requests):
+                    article = await timer.call(pop_next_article, user, projection)
+                    if article:
+                        feed_ids[user].append(str(article["_id"]))
+
+            await run_stage(timer, [browse(user) for user in users], args.concurrency)
+            await drain_background_tasks()
+
+        if "page" in timers:
+            timer = timers["page"]
+
+            async def scroll(user):
+                cursor = None
+                for _ in range(args.feed_pages):
+                    page = await timer.call(next_feed_page, user, args.page_size, cursor, projection)
+                    articles, cursor = page or ([], None)
+                    feed_ids[user].extend(str(article["_id"]) for article in articles)
+
+            await run_stage(timer, [scroll(user) for user in users], args.concurrency)
+            await drain_background_tasks()
+
+        if "read" in timers:
+            timer = timers["read"]
+
+            async def read(user):
+                for article_id in feed_ids[user][:args.reads]:
+                    await timer.call(track_user_read, user, article_id, 45)
+
+            await run_stage(timer, [read(user) for user in users], args.concurrency)
+            await drain_background_tasks()
+
+        if "verify" in timers:
+            timer = timers["verify"]
+            claims = corpus.claims(args.claims)
+            await run_stage(timer, [timer.call(handle_claim_verification, claim) for claim in claims], args.concurrency)
+    finally:
+        await db.client.drop_database(args.db)
+        await runner.cleanup()
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "config": vars(args),
+        "stages": {name: timer.report() for name, timer in timers.items()},
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, stage in report["stages"].items():
+        latency = stage["latency_ms"]
+        print(f"{name:8} n={stage['count']:<5} err={stage['errors']:<3} "
+              f"{stage['throughput_per_second']:8.1f}/s  p50={latency.get('p50', 0):8.1f}ms  p99={latency.get('p99', 0):8.1f}ms")
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
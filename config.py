@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -6,17 +7,66 @@ class Config:
     MONGO_URI = os.getenv("MONGO_URI", "")
     SECRET_KEY = os.getenv("SECRET_KEY", "")
     GNEWS_API_KEY = os.getenv("GNEWS_API_KEY", "")
-    FAISS_INDEX_DIR = "faiss_indexes"
-    RSS_SOURCES = {
+    FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", "faiss_indexes")
+    RSS_SOURCES = json.loads(os.getenv("RSS_SOURCES", "null")) or {
         "bbc": "http://feeds.bbci.co.uk/news/world/rss.xml",
         "aljazeera": "https://www.aljazeera.com/xml/rss/all.xml",
         "reuters": "https://www.reuters.com/world/rss.xml",
         "ndtv": "https://www.ndtv.com/rss",
         "thehindu": "https://www.thehindu.com/news/national/?service=rss"
     }
+    # External endpoints, overridable so benchmarks can point them at local fixtures
+    GNEWS_URL = os.getenv("GNEWS_URL", "https://gnews.io/api/v4/top-headlines")
+    SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+    FACT_CHECK_URL = os.getenv("FACT_CHECK_URL", "https://factchecktools.googleapis.com/v1alpha1/claims:search")
+    WIKIPEDIA_URL = os.getenv("WIKIPEDIA_URL", "https://en.wikipedia.org")
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
     SERPER_API_KEY = os.getenv("SERPER_API_KEY", "")
     GOOGLE_FACT_CHECK_API_KEY = os.getenv("GOOGLE_FACT_CHECK_API_KEY", "")
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+    GROQ_MODEL = os.getenv("GROQ_MODEL", "gemma2-9b-it")
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")  # "groq" or "stub"
+    LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))
+    NEWS_AGENT_MEMORY_TURNS = int(os.getenv("NEWS_AGENT_MEMORY_TURNS", "4"))
+    NEWS_AGENT_USAGE_HISTORY = int(os.getenv("NEWS_AGENT_USAGE_HISTORY", "50"))
+    NEWS_AGENT_CACHE_TTL = int(os.getenv("NEWS_AGENT_CACHE_TTL", str(6 * 60 * 60)))  # seconds
+    FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "100"))
+    FEED_CANDIDATES = int(os.getenv("FEED_CANDIDATES", "300"))
+    FEED_QUEUE_LOW_WATER = int(os.getenv("FEED_QUEUE_LOW_WATER", "10"))
+    FEED_POP_ATTEMPTS = int(os.getenv("FEED_POP_ATTEMPTS", "5"))
+    FEED_CRAWL_COOLDOWN = int(os.getenv("FEED_CRAWL_COOLDOWN", "300"))  # seconds
+    # Per-user HNSW index for ranking; when disabled the profile centroids are used
+    USER_INDEX_ENABLED = os.getenv("USER_INDEX_ENABLED", "false").lower() == "true"
+    PROFILE_CENTROIDS = int(os.getenv("PROFILE_CENTROIDS", "3"))
+    PROFILE_MERGE_THRESHOLD = float(os.getenv("PROFILE_MERGE_THRESHOLD", "0.6"))
+    PROFILE_HALF_LIFE = float(os.getenv("PROFILE_HALF_LIFE", str(7 * 24 * 60 * 60)))  # seconds
+    PROFILE_DURATION_CAP = int(os.getenv("PROFILE_DURATION_CAP", "120"))  # seconds
+    PROFILE_MIN_READ_WEIGHT = float(os.getenv("PROFILE_MIN_READ_WEIGHT", "0.1"))
+    PREVIEW_CHARS = int(os.getenv("PREVIEW_CHARS", "300"))
+    EMBEDDING_CODEC = os.getenv("EMBEDDING_CODEC", "f32")  # "f32", "f16" or "i8"
+    BACKGROUND_CONCURRENCY = int(os.getenv("BACKGROUND_CONCURRENCY", "16"))
+    HEARTBEAT_FLUSH_SECONDS = float(os.getenv("HEARTBEAT_FLUSH_SECONDS", "60"))
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "0"))  # 0 = one per core
+    # Opt-in request/job profiling, see utils/profiling.py
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_JOBS = os.getenv("PROFILE_JOBS", "")  # comma separated job names or "*"
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # seconds between samples
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    WARMUP_INDEXES = os.getenv("WARMUP_INDEXES", "global.index")  # FAISS indexes preloaded at startup
+    WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+    # Background jobs run only in the process holding this Mongo lease
+    LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+    LEADER_RENEW_SECONDS = float(os.getenv("LEADER_RENEW_SECONDS", "10"))
+    READ_FLUSH_SECONDS = float(os.getenv("READ_FLUSH_SECONDS", "1"))
+    READ_BUFFER_MAX = int(os.getenv("READ_BUFFER_MAX", "5000"))  # pending events that trigger an early flush
+    READ_BATCH_LIMIT = int(os.getenv("READ_BATCH_LIMIT", "1000"))  # events accepted per request
+    # Per-user article copies: "none" keeps plain content, "zlib" or "zstd" stores content_z
+    CONTENT_CODEC = os.getenv("CONTENT_CODEC", "none")
+    CONTENT_LEVEL = int(os.getenv("CONTENT_LEVEL", "6"))
+    # HNSW parameters for new indexes (M) and all searches (efSearch, overriding the saved value); see benchmarks/ann_eval.py
+    FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "news")
 
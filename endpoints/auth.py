@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, status
-from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
 from utils.database import db
+from utils.passwords import hash_password, verify_password
 from model.user import UserCreate, UserLogin
 from pydantic import BaseModel
 import os
@@ -23,7 +23,6 @@ class LoginResponse(BaseModel):
         json_schema_extra = {"example": {"access_token": "jwt_token_here", "token_type": "bearer"}}
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 async def get_user(email: str):
     return await db.db.users.find_one({"email": email})
@@ -44,7 +43,7 @@ async def signup(user: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_dict = user.dict()
-    user_dict["password"] = pwd_context.hash(user.password)
+    user_dict["password"] = await hash_password(user.password)
     user_id = await create_user(user_dict)
     # Start background task for fetching articles for this user
     asyncio.create_task(deduplicate_articles_for_user(str(user_id)))
@@ -53,8 +52,14 @@ async def signup(user: UserCreate):
 @router.post("/login", response_model=LoginResponse)
 async def login(data: UserLogin):
     user = await get_user(data.email)
-    if not user or not pwd_context.verify(data.password, user["password"]):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_password(data.password, user["password"])
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an outdated cost factor, upgrade while we have the plaintext
+        await db.db.users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
     
     token = await create_access_token({"sub": str(user["_id"])})
     return LoginResponse(access_token=token, token_type="bearer")
@@ -1,10 +1,16 @@
 from fastapi import APIRouter
 from model.article import ClaimInput, ClaimVerdictOut
-from services.fake_news_service import handle_claim_verification
+from services.fake_news_service import handle_claim_verification, stream_claim_verification
+from utils.streaming import ndjson_response
 
 router = APIRouter()
 
 @router.post("/claim-verdict", response_model=ClaimVerdictOut)
 async def claim_verdict(input: ClaimInput):
     verdict, explanation = await handle_claim_verification(input.claim)
-    return ClaimVerdictOut(verdict=verdict, explanation=explanation) 
\ No newline at end of file
+    return ClaimVerdictOut(verdict=verdict, explanation=explanation)
+
+@router.post("/claim-verdict/stream")
+async def claim_verdict_stream(input: ClaimInput):
+    """Streams `sources`, `summary`, `token` and a final `verdict` event as NDJSON."""
+    return ndjson_response(stream_claim_verification(input.claim))
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+from utils.heartbeat import heartbeat
+from utils import metrics
+from utils.startup import startup
+from utils.leader import leader
+
+router = APIRouter()
+
+# Both checks are answered locally, without touching Mongo or other services
+
+@router.get("/healthz")
+async def liveness():
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readiness():
+    status = heartbeat.status()
+    ready = startup.ready and status["running"] and status["last_flush_error"] is None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not ready",
+            "startup": startup.as_dict(),
+            "leader": leader.is_leader,
+            "heartbeat": {k: str(v) if v else v for k, v in status.items()},
+        }
+    )
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.latest()
+    return Response(content=body, media_type=content_type)
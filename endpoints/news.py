@@ -1,17 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Header
-from services.news_service import get_news_for_user, track_user_read, deduplicate_articles, deduplicate_articles_for_user
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
+from services.news_service import track_user_read, deduplicate_articles_for_user
+from services.feed_queue import pop_next_article, next_feed_page
 from utils.database import db
 from jose import jwt
 from config import Config
-from utils.mongo_helpers import to_json_serializable
-from tasks.background import scheduler
-from datetime import datetime
+from utils.mongo_helpers import parse_fields, article_projection, article_to_out, LEAN_FIELDS
 from bson.objectid import ObjectId
-from services.news_aggregator import fetch_all_articles
+from services.search_service import search_articles, SEARCH_MODES
 # from googletrans import Translator
-from model.article import ArticleOut, SavedArticleOut, SearchArticleOut, NewsAgentInput, NewsAgentOutput, NewsAgentFollowUpInput, NewsAgentFollowUpOutput
+from model.article import ReadBatchIn, ReadBatchOut, FeedArticleOut, FeedPageOut, SavedArticleOut, SearchArticleOut, NewsAgentInput, NewsAgentOutput, NewsAgentFollowUpInput, NewsAgentFollowUpOutput
 from typing import List, Dict, Any
 from services import news_agent_service
+from utils.streaming import ndjson_response
+from services.read_buffer import read_buffer
+from services import saved_articles
+from utils.content_codec import article_content, ensure_dictionaries
 
 router = APIRouter()
 
@@ -26,32 +29,44 @@ async def get_current_user(authorization: str = Header(...)):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-@router.get("/news", response_model=ArticleOut)
-async def get_news(token: str = Depends(get_current_user)):
-    articles = await get_news_for_user(token)
-    if not articles:
+FIELDS_DESCRIPTION = "Comma-separated article fields to return instead of the default set, e.g. article_id,title,url"
+INCLUDE_DESCRIPTION = "Comma-separated extra fields on top of the default set, e.g. content,embedding"
+
+def _selected_fields(fields: str = None, include: str = None, **kwargs):
+    try:
+        return parse_fields(fields, include, **kwargs)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+@router.get("/news", response_model=FeedArticleOut, response_model_exclude_unset=True)
+async def get_news(
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    include: str = Query(None, description=INCLUDE_DESCRIPTION),
+    token: str = Depends(get_current_user)
+):
+    selected = _selected_fields(fields, include)
+    # Pops the next item of the precomputed ranked queue (and marks it seen)
+    article = await pop_next_article(token, article_projection(selected))
+    if not article:
         raise HTTPException(status_code=404, detail="No articles found")
-    article = articles[0][0]
-    # Convert MongoDB document to ArticleOut format
-    article_out = ArticleOut(
-        article_id=str(article["_id"]),
-        title=article["title"],
-        content=article["content"],
-        category=article.get("category"),
-        published=article.get("published"),
-        source=article.get("source"),
-        url=article.get("url"),
-        user_id=article.get("user_id"),
-        embedding=article.get("embedding"),
-        fetched_at=article.get("fetched_at"),
-        seen=article.get("seen", False),
-        verified=article.get("verified", False),
-        verdict=article.get("verdict"),
-        explanation=article.get("explanation")
-    )
-    # Update seen status in DB
-    await db.db.articles.update_one({"_id": article["_id"]}, {"$set": {"seen": True}})
-    return article_out
+    await ensure_dictionaries([article])
+    return article_to_out(article, selected)
+
+@router.get("/news/feed", response_model=FeedPageOut, response_model_exclude_unset=True)
+async def get_news_feed(
+    limit: int = Query(10, ge=1, le=50, description="Number of articles to return"),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    include: str = Query(None, description=INCLUDE_DESCRIPTION),
+    token: str = Depends(get_current_user)
+):
+    selected = _selected_fields(fields, include)
+    try:
+        articles, next_cursor = await next_feed_page(token, limit, cursor, article_projection(selected))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    await ensure_dictionaries(articles)
+    return {"articles": [article_to_out(a, selected) for a in articles], "next_cursor": next_cursor}
 
 # @router.get("/news/{category}")
 # async def get_category_news(category: str, token: str = Depends(get_current_user)):
@@ -67,6 +82,21 @@ async def get_news(token: str = Depends(get_current_user)):
 #         raise HTTPException(status_code=404, detail="No articles for this source")
 #     return to_json_serializable(articles[0][0])
 
+@router.post("/read/batch", response_model=ReadBatchOut, status_code=202)
+async def track_read_batch(batch: ReadBatchIn, token: str = Depends(get_current_user)):
+    """
+    Buffer many read events at once; they are written to Mongo and FAISS shortly after.
+    Repeated events for the same article are collapsed, events with invalid ids are rejected.
+    """
+    if len(batch.events) > Config.READ_BATCH_LIMIT:
+        raise HTTPException(status_code=413, detail=f"At most {Config.READ_BATCH_LIMIT} events per batch")
+    accepted = 0
+    for event in batch.events:
+        if ObjectId.is_valid(event.article_id) and event.duration >= 0:
+            read_buffer.add(token, event.article_id, event.duration)
+            accepted += 1
+    return ReadBatchOut(accepted=accepted, rejected=len(batch.events) - accepted)
+
 @router.post("/read/{article_id}", response_model=Dict[str, str])
 async def track_read(article_id: str, duration: int, token: str = Depends(get_current_user)):
     success = await track_user_read(token, article_id, duration)
@@ -87,57 +117,65 @@ async def fetch_latest_news(token: str = Depends(get_current_user)):
 
 @router.post("/news/save/{article_id}", response_model=Dict[str, str])
 async def save_article(article_id: str, token: str = Depends(get_current_user)):
-    user_id = token
-    existing = await db.db.saved_articles.find_one({"user_id": user_id, "article_id": article_id})
-    if existing:
-        return {"msg": "Article already saved"}
-    article = await db.db.articles.find_one({"_id": ObjectId(article_id), "user_id": user_id})
-    if not article:
+    saved = await saved_articles.save_article(token, article_id)
+    if saved is None:
         raise HTTPException(status_code=404, detail="Article not found for this user")
-    save_doc = {
-        "user_id": user_id,
-        "article_id": article_id,
-        "saved_at": datetime.utcnow(),
-        "article": article
-    }
-    await db.db.saved_articles.insert_one(save_doc)
-    return {"msg": "Article saved"}
-
-@router.get("/news/saved", response_model=List[ArticleOut])
-async def get_saved_articles(token: str = Depends(get_current_user)):
-    user_id = token
-    cursor = db.db.saved_articles.find({"user_id": user_id}).sort("saved_at", -1)
-    saved = []
-    async for doc in cursor:
-        # Return just the article details for each saved article
-        saved.append(ArticleOut(**doc["article"]))
+    return {"msg": "Article saved" if saved else "Article already saved"}
+
+@router.get("/news/saved", response_model=List[FeedArticleOut], response_model_exclude_unset=True)
+async def get_saved_articles(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Number of saved articles to return"),
+    cursor: str = Query(None, description="X-Next-Cursor header from the previous page"),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    include: str = Query(None, description=INCLUDE_DESCRIPTION),
+    token: str = Depends(get_current_user)
+):
+    """Newest first. When more remain, the X-Next-Cursor response header holds the next page's cursor."""
+    selected = _selected_fields(fields, include, default=saved_articles.SAVED_FIELDS)
+    try:
+        saved, next_cursor = await saved_articles.list_saved(token, selected, limit, cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return saved
 
-@router.get("/news/saved/{article_id}", response_model=ArticleOut)
-async def get_saved_article(article_id: str, token: str = Depends(get_current_user)):
-    user_id = token
-    doc = await db.db.saved_articles.find_one({"user_id": user_id, "article_id": article_id})
-    if not doc:
+@router.get("/news/saved/{article_id}", response_model=FeedArticleOut, response_model_exclude_unset=True)
+async def get_saved_article(
+    article_id: str,
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    include: str = Query(None, description=INCLUDE_DESCRIPTION),
+    token: str = Depends(get_current_user)
+):
+    # Detail view: full content by default, still no embedding
+    selected = _selected_fields(fields, include, default=LEAN_FIELDS + ("content",))
+    saved = await saved_articles.get_saved(token, article_id, selected)
+    if not saved:
         raise HTTPException(status_code=404, detail="Saved article not found")
-    return ArticleOut(**doc["article"])
+    return saved
 
 @router.get("/news/search", response_model=List[SearchArticleOut])
-async def search_news(query: str = Query(..., description="Keywords or description to search in news")):
-    articles = await fetch_all_articles()
-    query_lower = query.lower()
-    filtered = [
+async def search_news(
+    query: str = Query(..., description="Keywords or description to search in news"),
+    mode: str = Query("hybrid", description="keyword, semantic or hybrid"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results")
+):
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+    # Searches the articles already ingested, never crawls publishers
+    articles = await search_articles(query, mode, limit)
+    return [
         SearchArticleOut(
             headline=a.get("title"),
-            content=a.get("content"),
+            content=article_content(a) or "",
             timestamp=a.get("published"),
             source=a.get("source"),
             category=a.get("category"),
             url=a.get("url")
         )
         for a in articles
-        if query_lower in (a.get("title", "").lower() + " " + a.get("content", "").lower())
     ]
-    return filtered
 
 # @router.get("/news/translate/{article_id}", response_model=ArticleOut)
 # async def translate_article(article_id: str, token: str = Depends(get_current_user)):
@@ -186,6 +224,15 @@ async def get_more_about_news(input: NewsAgentInput):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/get_more_about_news/stream")
+async def get_more_about_news_stream(input: NewsAgentInput):
+    """Streams agent tokens as NDJSON, ending with a `done` event carrying the session."""
+    try:
+        article = await news_agent_service.find_article(input.article_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    return ndjson_response(news_agent_service.stream_news_agent_session(input.article_id, article))
+
 @router.post("/get_more_follow_up", response_model=NewsAgentFollowUpOutput)
 async def get_more_follow_up(input: NewsAgentFollowUpInput):
     try:
@@ -194,33 +241,37 @@ async def get_more_follow_up(input: NewsAgentFollowUpInput):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/get_more_follow_up/stream")
+async def get_more_follow_up_stream(input: NewsAgentFollowUpInput):
+    """Streams agent tokens as NDJSON, ending with a `done` event carrying the answer."""
+    try:
+        session = await news_agent_service.find_session(input.session_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return ndjson_response(news_agent_service.stream_follow_up_session(session, input.question))
+
 @router.get("/me")
-async def get_me(user=Depends(get_current_user)):
+async def get_me(
+    saved_limit: int = Query(20, ge=1, le=100, description="Number of saved articles to include"),
+    saved_cursor: str = Query(None, description="saved_next_cursor from a previous response"),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    include: str = Query(None, description=INCLUDE_DESCRIPTION),
+    user=Depends(get_current_user)
+):
     # user is the JWT payload (sub = user_id)
-    user_doc = await db.db.users.find_one({"_id": ObjectId(user)})
+    user_doc = await db.db.users.find_one({"_id": ObjectId(user)}, {"name": 1, "gender": 1, "email": 1})
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
-    # Get saved articles for this user
-    saved_cursor = db.db.saved_articles.find({"user_id": user})
-    saved_articles = []
-    async for doc in saved_cursor:
-        art = doc.get("article", {})
-        article_id = art.get("_id") or doc.get("article_id")
-        if isinstance(article_id, ObjectId):
-            article_id = str(article_id)
-        saved_articles.append({
-            "article_id": article_id,
-            "title": art.get("title"),
-            "content": art.get("content"),
-            "category": art.get("category"),
-            "published": art.get("published"),
-            "source": art.get("source"),
-            "url": art.get("url")
-        })
+    selected = _selected_fields(fields, include, default=saved_articles.SAVED_FIELDS)
+    try:
+        saved, next_cursor = await saved_articles.list_saved(user, selected, saved_limit, saved_cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     return {
         "user_id": str(user_doc["_id"]),
         "name": user_doc.get("name"),
         "gender": user_doc.get("gender"),
         "email": user_doc.get("email"),
-        "saved_articles": saved_articles
+        "saved_articles": saved,
+        "saved_next_cursor": next_cursor
     }
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from utils import profiling
+import os
+
+router = APIRouter()
+
+@router.get("/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, x_profile_token: str = Header(None)):
+    """Download a stored speedscope profile; requires the profiling admin token."""
+    if not profiling.authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        path = profiling.profile_path(profile_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=profile_id)
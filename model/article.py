@@ -28,7 +28,8 @@ class Article(BaseModel):
 class ArticleOut(BaseModel):
     article_id: Optional[str] = None
     title: str
-    content: str
+    content: Optional[str] = None
+    preview: Optional[str] = None
     category: Optional[str]
     published: Optional[str]
     source: Optional[str]
@@ -59,6 +60,37 @@ class ArticleOut(BaseModel):
             }
         }
 
+class FeedArticleOut(BaseModel):
+    article_id: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    preview: Optional[str] = None
+    category: Optional[str] = None
+    published: Optional[str] = None
+    source: Optional[str] = None
+    url: Optional[str] = None
+    user_id: Optional[str] = None
+    embedding: Optional[List[float]] = None
+    fetched_at: Optional[datetime] = None
+    seen: Optional[bool] = None
+    verified: Optional[bool] = None
+    verdict: Optional[str] = None
+    explanation: Optional[str] = None
+
+class FeedPageOut(BaseModel):
+    articles: List[FeedArticleOut]
+    next_cursor: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "articles": [
+                    {"article_id": "507f1f77bcf86cd799439011", "title": "Sample News Title", "preview": "This is the content...", "url": "https://example.com/news/123"}
+                ],
+                "next_cursor": "NjY1ZjFhMmIzYzRkNWU2ZjcwODE5MmEzOjEw"
+            }
+        }
+
 class SavedArticleOut(BaseModel):
     user_id: str
     article_id: str
@@ -100,6 +132,19 @@ class ReadEvent(BaseModel):
     article_id: str
     duration: int  # in seconds
 
+class ReadEventIn(BaseModel):
+    article_id: str
+    duration: int  # in seconds
+
+class ReadBatchIn(BaseModel):
+    events: List[ReadEventIn]
+    class Config:
+        json_schema_extra = {"example": {"events": [{"article_id": "60f7c0b8e1d3c2a5b8e4d123", "duration": 45}]}}
+
+class ReadBatchOut(BaseModel):
+    accepted: int
+    rejected: int
+
 class ClaimInput(BaseModel):
     claim: str
     class Config:
@@ -0,0 +1,31 @@
+"""Store faiss_id on search-corpus articles ingested before it was recorded.
+
+Usage: python -m scripts.backfill_faiss_ids [--batch 500]
+
+The id is derived from the ObjectId, so this only writes what global.index already uses.
+"""
+import argparse
+import asyncio
+from pymongo import UpdateOne
+from utils.database import db
+from utils.faiss_manager import faiss_id
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    cursor = db.db.articles.find({"user_id": {"$exists": False}, "faiss_id": {"$exists": False}}, {"_id": 1})
+    ops, total = [], 0
+    async for doc in cursor:
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"faiss_id": faiss_id(doc["_id"])}}))
+        if len(ops) >= args.batch:
+            await db.db.articles.bulk_write(ops, ordered=False)
+            total += len(ops)
+            ops = []
+    if ops:
+        await db.db.articles.bulk_write(ops, ordered=False)
+        total += len(ops)
+    print(f"Backfilled faiss_id on {total} articles")
+
+if __name__ == "__main__":
+    asyncio.run(main())
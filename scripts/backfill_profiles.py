@@ -0,0 +1,80 @@
+"""Build interest profiles from each user's read history.
+
+Usage: python -m scripts.backfill_profiles [--missing-only] [--dry-run]
+
+Replays user_reads oldest first through the same update as live reads, so the
+result matches a profile that had existed all along. Embeddings come from the
+read articles; for articles already removed by cleanup they are recovered from
+the user's FAISS index (user_<id>.index) when one exists. Run it before
+switching from USER_INDEX_ENABLED=true to the profile ranker; rerunning is safe.
+"""
+import argparse
+import asyncio
+import os
+import faiss
+from bson import ObjectId
+from config import Config
+from utils.database import db
+from utils.embedding_codec import decode_embedding
+from utils.faiss_manager import faiss_id
+from services import user_profile
+
+def index_embeddings(user_id: str, article_ids):
+    """Vectors of the given articles from the user's FAISS index, keyed by article id."""
+    path = os.path.join(Config.FAISS_INDEX_DIR, f"user_{user_id}.index")
+    if not article_ids or not os.path.exists(path):
+        return {}
+    index = faiss.read_index(path)
+    positions = {int(i): pos for pos, i in enumerate(faiss.vector_to_array(index.id_map))}
+    found = {}
+    for article_id in article_ids:
+        pos = positions.get(faiss_id(ObjectId(article_id)))
+        if pos is not None:
+            found[article_id] = index.index.reconstruct(pos)
+    return found
+
+async def read_history(user_id: str):
+    """(embedding, duration, timestamp) for every read we can still find a vector for, oldest first."""
+    reads = await db.db.user_reads.find({"user_id": user_id}).sort("timestamp", 1).to_list(length=None)
+    ids = list({r["article_id"] for r in reads})
+    articles = await db.db.articles.find(
+        {"_id": {"$in": [ObjectId(i) for i in ids]}}, {"embedding": 1}
+    ).to_list(length=len(ids))
+    embeddings = {str(a["_id"]): decode_embedding(a["embedding"]) for a in articles if a.get("embedding") is not None}
+    embeddings.update(index_embeddings(user_id, [i for i in ids if i not in embeddings]))
+    history = [(embeddings[r["article_id"]], r.get("duration", 0), r["timestamp"]) for r in reads if r["article_id"] in embeddings]
+    return history, len(reads)
+
+async def backfill_user(user_id: str, dry_run: bool):
+    """Returns (reads used, reads found) or None when the profile kept changing underneath."""
+    for _ in range(user_profile.UPDATE_ATTEMPTS):
+        current = await user_profile.get_profile(user_id)
+        history, total = await read_history(user_id)
+        if not history:
+            return 0, total
+        profile = user_profile.build_profile(history)
+        if dry_run or await user_profile.replace_profile(user_id, current, profile):
+            return len(history), total
+        # A live read landed meanwhile; it is in user_reads too, so rebuild
+    return None
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missing-only", action="store_true", help="skip users that already have a profile")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    query = {"profile": None} if args.missing_only else {}
+    users, used, total, failed = 0, 0, 0, 0
+    async for user in db.db.users.find(query, {"_id": 1}):
+        result = await backfill_user(str(user["_id"]), args.dry_run)
+        if result is None:
+            failed += 1
+            continue
+        users += bool(result[0])
+        used += result[0]
+        total += result[1]
+    print(f"Built {users} profiles from {used} of {total} reads"
+          f"{f', {failed} users skipped after repeated conflicts' if failed else ''}{' (dry run)' if args.dry_run else ''}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""Run explain() on every registered hot query shape and flag collection scans.
+
+Usage: python -m scripts.explain_queries [--create-indexes]
+
+Exits with status 1 when any shape is answered by a COLLSCAN.
+"""
+import argparse
+import asyncio
+import sys
+from utils.database import db
+from utils.indexes import QUERY_SHAPES
+
+def _stages(plan):
+    """Yield every stage in a (possibly nested) winning plan."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan
+    for key in ("inputStage", "queryPlan"):
+        yield from _stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+async def explain_shape(collection, query, sort):
+    cursor = db.db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explained = await cursor.explain()
+    stages = list(_stages(explained["queryPlanner"]["winningPlan"]))
+    names = [s["stage"] for s in stages]
+    indexes = sorted({s["indexName"] for s in stages if "indexName" in s})
+    return names, indexes
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--create-indexes", action="store_true", help="run the startup index bootstrapper first")
+    args = parser.parse_args()
+    if args.create_indexes:
+        await db.create_indexes()
+    collscans = 0
+    for name, collection, query, sort in QUERY_SHAPES:
+        stages, indexes = await explain_shape(collection, query, sort)
+        flag = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+        if "SORT" in stages:
+            flag += " (in-memory sort)"
+        collscans += "COLLSCAN" in stages
+        print(f"{flag:<24} {collection:<16} {name:<30} {' > '.join(stages)}  [{', '.join(indexes) or '-'}]")
+    print(f"\n{len(QUERY_SHAPES)} query shapes, {collscans} collection scans")
+    return 1 if collscans else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,57 @@
+"""Convert stored embeddings from BSON float arrays to packed binary.
+
+Usage: python -m scripts.migrate_embeddings [--codec f32|f16|i8] [--batch 500] [--dry-run]
+
+Safe to re-run: only documents whose embedding is still an array are touched.
+"""
+import argparse
+import asyncio
+import logging
+from pymongo import UpdateOne
+from utils.database import db
+from utils.embedding_codec import CODECS, encode_embedding
+
+logger = logging.getLogger("migrate_embeddings")
+
+# (collection, embedding field path)
+TARGETS = [
+    ("articles", "embedding"),
+    ("saved_articles", "article.embedding"),
+]
+
+async def migrate_collection(name: str, field: str, codec: str, batch_size: int, dry_run: bool) -> int:
+    collection = db.db[name]
+    cursor = collection.find({field: {"$type": "array"}}, {field: 1})
+    ops, migrated = [], 0
+    async for doc in cursor:
+        value = doc
+        for part in field.split("."):
+            value = value[part]
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: encode_embedding(value, codec)}}))
+        if len(ops) >= batch_size:
+            migrated += await _flush(collection, ops, dry_run)
+            ops = []
+    if ops:
+        migrated += await _flush(collection, ops, dry_run)
+    logger.info(f"{name}.{field}: {migrated} documents {'would be ' if dry_run else ''}migrated")
+    return migrated
+
+async def _flush(collection, ops, dry_run: bool) -> int:
+    if not dry_run:
+        await collection.bulk_write(ops, ordered=False)
+    return len(ops)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--codec", choices=sorted(CODECS), default=None, help="defaults to Config.EMBEDDING_CODEC")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    total = 0
+    for name, field in TARGETS:
+        total += await migrate_collection(name, field, args.codec, args.batch, args.dry_run)
+    logger.info(f"Done, {total} documents")
+
+if __name__ == "__main__":
+    asyncio.run(main())
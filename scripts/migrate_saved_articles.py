@@ -0,0 +1,55 @@
+"""Slim saved_articles holding a full article copy down to a reference and snapshot.
+
+Usage: python -m scripts.migrate_saved_articles [--batch 200] [--dry-run]
+
+The referenced article is pinned (saved=True) so cleanup keeps it. When it is
+already gone, the copy's content stays in the saved document so the detail
+view keeps working.
+"""
+import argparse
+import asyncio
+from bson import ObjectId
+from pymongo import UpdateOne
+from utils.database import db
+from services.saved_articles import snapshot
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    # Full copies are recognised by the embedding or the content they carry
+    cursor = db.db.saved_articles.find(
+        {"$or": [{"article.embedding": {"$exists": True}}, {"article.content": {"$exists": True}}]}
+    ).batch_size(args.batch)
+    saved_ops, pin_ops, orphaned = [], [], 0
+    slimmed = 0
+
+    async def write():
+        if not args.dry_run:
+            if pin_ops:
+                await db.db.articles.bulk_write(pin_ops, ordered=False)
+            if saved_ops:
+                await db.db.saved_articles.bulk_write(saved_ops, ordered=False)
+        pin_ops.clear()
+        saved_ops.clear()
+
+    async for doc in cursor:
+        article = doc.get("article", {})
+        slim = snapshot(article)
+        exists = await db.db.articles.count_documents({"_id": ObjectId(doc["article_id"]), "user_id": doc["user_id"]}, limit=1)
+        if exists:
+            pin_ops.append(UpdateOne({"_id": ObjectId(doc["article_id"])}, {"$set": {"saved": True}}))
+        else:
+            orphaned += 1
+            slim["content"] = article.get("content")
+        saved_ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"article": slim}}))
+        slimmed += 1
+        if len(saved_ops) >= args.batch:
+            await write()
+    await write()
+    action = "Would slim" if args.dry_run else "Slimmed"
+    print(f"{action} {slimmed} saved articles ({orphaned} kept their content, the article no longer exists)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
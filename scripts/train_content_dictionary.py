@@ -0,0 +1,121 @@
+"""Train a shared compression dictionary on stored article content.
+
+Usage: python -m scripts.train_content_dictionary [--codec zlib|zstd] [--samples 2000] [--recompress] [--dry-run]
+
+Samples plain content from the search corpus, stores the dictionary in
+content_dictionaries and reports the ratio with and without it. With
+--recompress, per-user article copies are rewritten to content_z using the new
+dictionary (plain content is dropped, content_preview is filled in).
+Set CONTENT_CODEC to the same codec so new ingests use it.
+"""
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from bson.binary import Binary
+from pymongo import UpdateOne
+from config import Config
+from utils.database import db
+from utils import content_codec
+
+logger = logging.getLogger("train_content_dictionary")
+
+ZLIB_MAX_DICTIONARY = 32 * 1024  # zlib only looks back one 32 KiB window
+
+def build_zlib_dictionary(samples, size: int) -> bytes:
+    """Frequent word 4-grams, most common last (zlib reaches the end of zdict cheapest)."""
+    counts = Counter()
+    for text in samples:
+        words = text.split()
+        counts.update({" ".join(words[i:i + 4]) for i in range(len(words) - 3)})
+    shared = [gram for gram, n in counts.most_common() if n > 1]
+    chunks, total = [], 0
+    for gram in shared:
+        encoded = gram.encode("utf-8") + b" "
+        if total + len(encoded) > size:
+            break
+        chunks.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chunks))
+
+def build_dictionary(codec: str, samples, size: int) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.train_dictionary(size, [s.encode("utf-8") for s in samples]).as_bytes()
+    return build_zlib_dictionary(samples, min(size, ZLIB_MAX_DICTIONARY))
+
+def ratio(samples, codec: str) -> float:
+    raw = sum(len(s.encode("utf-8")) for s in samples)
+    packed = sum(len(content_codec.encode_content(s, codec)) for s in samples)
+    return raw / max(packed, 1)
+
+async def recompress(codec: str, batch_size: int, dry_run: bool) -> int:
+    cursor = db.db.articles.find(
+        {"user_id": {"$exists": True}, "$or": [{"content": {"$type": "string"}}, {"content_z": {"$exists": True}}]},
+        {"content": 1, "content_z": 1}
+    )
+    ops, done = [], 0
+    async for doc in cursor:
+        text = content_codec.article_content(doc) or ""
+        ops.append(UpdateOne({"_id": doc["_id"]}, {
+            "$set": {"content_z": content_codec.encode_content(text, codec), "content_preview": text[:Config.PREVIEW_CHARS]},
+            "$unset": {"content": ""}
+        }))
+        if len(ops) >= batch_size:
+            done += len(ops)
+            if not dry_run:
+                await db.db.articles.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        done += len(ops)
+        if not dry_run:
+            await db.db.articles.bulk_write(ops, ordered=False)
+    return done
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    default_codec = Config.CONTENT_CODEC if content_codec.enabled() else "zlib"
+    parser.add_argument("--codec", choices=sorted(content_codec.CODECS), default=default_codec)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=110 * 1024, help="dictionary size in bytes (zlib is capped at 32 KiB)")
+    parser.add_argument("--recompress", action="store_true")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    docs = await db.db.articles.aggregate([
+        {"$match": {"user_id": {"$exists": False}, "content": {"$type": "string"}}},
+        {"$sample": {"size": args.samples}},
+        {"$project": {"content": 1}},
+    ]).to_list(length=args.samples)
+    samples = [d["content"] for d in docs if d["content"]]
+    if len(samples) < 10:
+        raise SystemExit(f"Only {len(samples)} samples with content, ingest more articles first")
+
+    await content_codec.load_dictionaries()
+    before = ratio(samples, args.codec)
+    data = build_dictionary(args.codec, samples, args.size)
+    latest = await db.db.content_dictionaries.find_one(sort=[("_id", -1)])
+    doc = {
+        "_id": (latest["_id"] if latest else 0) + 1,
+        "codec": args.codec,
+        "data": Binary(data),
+        "samples": len(samples),
+        "created_at": datetime.utcnow(),
+    }
+    content_codec.register_dictionary(doc)
+    after = ratio(samples, args.codec)
+    logger.info(f"{args.codec} dictionary {doc['_id']}: {len(data)} bytes from {len(samples)} samples, "
+                f"ratio {before:.2f}x -> {after:.2f}x")
+    if args.dry_run:
+        logger.info("Dry run, dictionary not stored")
+    else:
+        await db.db.content_dictionaries.insert_one(doc)
+    if args.recompress:
+        count = await recompress(args.codec, args.batch, args.dry_run)
+        logger.info(f"{count} per-user articles {'would be ' if args.dry_run else ''}recompressed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+"""Verify a batch of claims from JSONL with the claim-verdict pipeline.
+
+Usage: python -m scripts.verify_claims claims.jsonl [--output verdicts.jsonl] [--concurrency 8] [--rate 2]
+
+Each input line is {"id": ..., "claim": "..."} (id defaults to the line
+number) or a bare JSON string. Claims run through handle_claim_verification
+concurrently, at most --rate new claims per second. Verdicts are appended to
+--output as they finish, one JSON line each. The output file is the checkpoint:
+a rerun skips ids that already have a verdict and retries the ones that failed.
+A throughput and per-stage latency summary is printed at the end.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import numpy as np
+from services.fake_news_service import handle_claim_verification
+from utils.metrics import STAGE_SECONDS
+
+logger = logging.getLogger("verify_claims")
+
+STAGES = ("source_search", "scrape", "summarize", "verdict", "claim_verification")
+
+def read_claims(path: str, field: str):
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                yield str(number), item
+            elif item.get(field):
+                yield str(item.get("id", number)), item[field]
+            else:
+                logger.warning(f"line {number}: no {field!r}, skipped")
+
+def completed_ids(path: str) -> set:
+    """Ids that already have a verdict in a previous run's output."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # a line cut short when the last run was killed
+            if "verdict" in row:
+                done.add(str(row["id"]))
+    return done
+
+class RateLimiter:
+    """Spaces call starts at least 1/rate seconds apart (no limit when rate is 0)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+def stage_summary() -> dict:
+    """Count, mean and bucket-approximated p50/p95 per pipeline stage from the metrics histogram."""
+    counts, sums, buckets = {}, {}, {}
+    for metric in STAGE_SECONDS.collect():
+        for sample in metric.samples:
+            stage = sample.labels.get("stage")
+            if stage not in STAGES:
+                continue
+            if sample.name.endswith("_count"):
+                counts[stage] = sample.value
+            elif sample.name.endswith("_sum"):
+                sums[stage] = sample.value
+            elif sample.name.endswith("_bucket"):
+                buckets.setdefault(stage, []).append((float(sample.labels["le"]), sample.value))
+
+    def quantile(stage, q):
+        # Upper bound of the first bucket holding the q-th observation
+        for bound, cumulative in sorted(buckets[stage]):
+            if cumulative >= q * counts[stage]:
+                return bound * 1000
+        return float("inf")
+
+    return {
+        stage: {
+            "count": int(counts[stage]),
+            "mean_ms": sums[stage] / counts[stage] * 1000,
+            "p50_ms_le": quantile(stage, 0.5),
+            "p95_ms_le": quantile(stage, 0.95),
+        }
+        for stage in STAGES if counts.get(stage)
+    }
+
+async def verify_all(claims, output: str, concurrency: int, rate: float, timeout: float) -> dict:
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    limiter = RateLimiter(rate)
+    latencies, errors = [], 0
+
+    with open(output, "a") as out:
+        def write(row):
+            out.write(json.dumps(row) + "\n")
+            out.flush()
+
+        async def worker():
+            nonlocal errors
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                claim_id, claim = item
+                await limiter.wait()
+                start = time.perf_counter()
+                try:
+                    verdict, explanation = await asyncio.wait_for(handle_claim_verification(claim), timeout)
+                    row = {"id": claim_id, "claim": claim, "verdict": verdict, "explanation": explanation}
+                except Exception as e:
+                    errors += 1
+                    logger.warning(f"{claim_id}: {e!r}")
+                    row = {"id": claim_id, "claim": claim, "error": repr(e)}
+                elapsed = time.perf_counter() - start
+                latencies.append(elapsed)
+                write({**row, "seconds": round(elapsed, 3)})
+                if len(latencies) % 50 == 0:
+                    logger.info(f"{len(latencies)} claims done, {errors} failed")
+
+        start = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for item in claims:
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        wall = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+    return {
+        "claims": len(latencies),
+        "errors": errors,
+        "wall_seconds": wall,
+        "claims_per_second": len(latencies) / wall if wall else 0.0,
+        "latency_ms": {
+            "mean": float(ms.mean()),
+            **{f"p{p}": float(np.percentile(ms, p)) for p in (50, 95, 99)},
+        } if len(ms) else {},
+        "stages": stage_summary(),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file of claims")
+    parser.add_argument("--output", default="verdicts.jsonl", help="verdicts JSONL, also the resume checkpoint")
+    parser.add_argument("--field", default="claim", help="claim text field in each input object")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=2.0, help="max new claims per second, 0 for no limit")
+    parser.add_argument("--timeout", type=float, default=180.0, help="seconds before a claim counts as failed")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many claims")
+    parser.add_argument("--summary", default=None, help="also write the summary JSON here")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    done = completed_ids(args.output)
+    if done:
+        logger.info(f"Resuming: {len(done)} claims already verified in {args.output}")
+
+    def pending():
+        seen, count = set(done), 0
+        for claim_id, claim in read_claims(args.input, args.field):
+            if claim_id in seen:
+                continue
+            if args.limit is not None and count >= args.limit:
+                return
+            seen.add(claim_id)
+            count += 1
+            yield claim_id, claim
+
+    summary = await verify_all(pending(), args.output, args.concurrency, args.rate, args.timeout)
+    summary["skipped"] = len(done)
+    print(json.dumps(summary, indent=2))
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import math
+from typing import List, Tuple
+from langchain.prompts import PromptTemplate
+from config import Config
+from services.llm import lazy_llm
+
+# Bounded conversation memory for news-agent sessions: the last K turns are
+# kept verbatim, older turns are folded into a running summary.
+
+summary_prompt = PromptTemplate.from_template("""
+You maintain a compact running summary of a conversation about a news article.
+Current summary:
+{summary}
+
+New conversation lines to fold in:
+{lines}
+
+Rewrite the summary so it keeps every fact, question and conclusion that may matter
+for later follow-up questions. Use at most 150 words.
+SUMMARY:
+""")
+
+summary_chain = summary_prompt | lazy_llm
+
+def window_size() -> int:
+    # One turn is a user message plus the assistant answer
+    return 2 * Config.NEWS_AGENT_MEMORY_TURNS
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough to watch the trend per turn
+    return math.ceil(len(text) / 4)
+
+def format_messages(messages: List[dict]) -> str:
+    return "\n".join([f"{m['role']}: {m['content']}" for m in messages])
+
+def split_overflow(history: List[dict], new_messages: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """Return (evicted, kept) once new_messages are appended to the window."""
+    combined = history + new_messages
+    cut = max(0, len(combined) - window_size())
+    return combined[:cut], combined[cut:]
+
+async def roll_summary(summary: str, evicted: List[dict]) -> str:
+    if not evicted:
+        return summary
+    try:
+        result = await summary_chain.ainvoke({"summary": summary or "(empty)", "lines": format_messages(evicted)})
+        return getattr(result, "content", str(result)).strip()
+    except Exception:
+        # Never lose the evicted turns entirely, keep a truncated transcript instead
+        return (summary + "\n" + format_messages(evicted))[-2000:].strip()
+
+def build_prompt(context: dict, question: str) -> str:
+    parts = []
+    if context.get("background"):
+        parts.append(f"Article and initial analysis:\n{context['background']}\nassistant: {context.get('analysis', '')}")
+    if context.get("summary"):
+        parts.append(f"Summary of earlier conversation:\n{context['summary']}")
+    history = context.get("history", [])[-window_size():]
+    if history:
+        parts.append(f"Recent conversation:\n{format_messages(history)}")
+    context_str = "\n\n".join(parts)
+    return f"Context so far:\n{context_str}\n\nFollow-up question: {question}\nAnswer in detail."
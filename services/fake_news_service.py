@@ -1,24 +1,20 @@
 import requests
 from bs4 import BeautifulSoup
-from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 # from duckduckgo_search import DDGS
 import wikipedia
-from typing import Tuple, List
+from typing import AsyncIterator, Tuple, List
 from config import Config
+from services.llm import lazy_llm
+from utils.singleflight import SingleFlight, Broadcast
+from utils.metrics import timed, track
 import json
 import asyncio
 import httpx
 
-# Lazy initialization for Groq LLM
-
-def get_groq_llm():
-    return ChatGroq(
-        model="gemma2-9b-it",
-        temperature=0.2,
-        api_key=Config.GROQ_API_KEY,
-    )
+wikipedia.wikipedia.API_URL = f"{Config.WIKIPEDIA_URL}/w/api.php"
 
+@timed("scrape")
 async def async_scrape_full_article(url):
     try:
         headers = {"User-Agent": "Mozilla/5.0"}
@@ -43,21 +39,43 @@ SUMMARY:
 - 
 """)
 
+verdict_prompt = PromptTemplate.from_template("""
+You are a news verification expert.
+Given the following claim:
+CLAIM: "{claim}"
+Here is summary of evidences from multiple sources:
+{evidence}
+Based on this information, is the claim REAL or FAKE?
+Respond ONLY in the following JSON format:
+{{
+  "verdict": "REAL or FAKE",
+  "explanation": "A short 2-3 sentence explanation."
+}}
+""")
+
+# Chains are composed once; the LLM client behind them is resolved lazily
+summary_chain = summarization_prompt | lazy_llm
+verdict_chain = verdict_prompt | lazy_llm
+
+def _result_text(result) -> str:
+    if hasattr(result, "content"):
+        return result.content
+    if isinstance(result, str):
+        return result
+    return str(result)
+
+@timed("summarize")
 async def async_summarize_article(article_text):
     if not article_text.strip():
         return "[Empty Article]"
     try:
-        groq_llm = get_groq_llm()
-        chain = summarization_prompt | groq_llm
-        loop = asyncio.get_event_loop()
-        # Run the blocking LLM call in a thread pool for concurrency
-        summary = await loop.run_in_executor(None, lambda: chain.invoke({"text": article_text[:4000]}))
-        return summary.strip() if isinstance(summary, str) else str(summary)
+        summary = await summary_chain.ainvoke({"text": article_text[:4000]})
+        return _result_text(summary).strip()
     except Exception:
         return "[Summary failed]"
 
 def serper_urls(claim):
-    url = "https://google.serper.dev/search"
+    url = Config.SERPER_URL
     headers = {
         "X-API-KEY": Config.SERPER_API_KEY,
         "Content-Type": "application/json"
@@ -73,12 +91,12 @@ def serper_urls(claim):
 def wiki_urls(claim):
     try:
         titles = wikipedia.search(claim, results=3)
-        return [f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}" for title in titles]
+        return [f"{Config.WIKIPEDIA_URL}/wiki/{title.replace(' ', '_')}" for title in titles]
     except:
         return []
 
 def google_fact_check_urls(claim):
-    url = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
+    url = Config.FACT_CHECK_URL
     params = {
         "query": claim,
         "key": Config.GOOGLE_FACT_CHECK_API_KEY
@@ -94,44 +112,36 @@ def google_fact_check_urls(claim):
                 links.append(link)
     return links[:3]
 
-async def run_all_sources_with_summary(claim) -> List[str]:
+def gather_source_urls(claim) -> List[str]:
     all_urls = []
     all_urls += serper_urls(claim)
     # all_urls += ddg_urls(claim)
     all_urls += wiki_urls(claim)
     all_urls += google_fact_check_urls(claim)
-    # Scrape all articles concurrently
-    articles = await asyncio.gather(*(async_scrape_full_article(url) for url in all_urls))
-    # Summarize all articles concurrently
-    summaries = await asyncio.gather(*(async_summarize_article(article) for article in articles if article and not article.startswith("[Error")))
-    return summaries
+    return all_urls
 
-def get_final_verdict_from_llm(claim, all_evidence_texts) -> Tuple[str, str]:
-    evidence_combined = "\n\n".join(all_evidence_texts[:20])[:45000]
-    prompt_template = PromptTemplate.from_template("""
-You are a news verification expert.
-Given the following claim:
-CLAIM: "{claim}"
-Here is summary of evidences from multiple sources:
-{evidence}
-Based on this information, is the claim REAL or FAKE?
-Respond ONLY in the following JSON format:
-{{
-  "verdict": "REAL or FAKE",
-  "explanation": "A short 2-3 sentence explanation."
-}}
-""")
-    groq_llm = get_groq_llm()
-    chain = prompt_template | groq_llm
-    result = chain.invoke({"claim": claim, "evidence": evidence_combined})
+@timed("source_search")
+async def async_gather_source_urls(claim) -> List[str]:
+    # The search APIs use blocking clients, keep them off the event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, gather_source_urls, claim)
+
+async def scrape_and_summarize(url):
+    article = await async_scrape_full_article(url)
+    if not article or article.startswith("[Error"):
+        return None
+    return await async_summarize_article(article)
+
+async def run_all_sources_with_summary(claim) -> List[str]:
+    all_urls = await async_gather_source_urls(claim)
+    # Scrape and summarize all articles concurrently
+    summaries = await asyncio.gather(*(scrape_and_summarize(url) for url in all_urls))
+    return [summary for summary in summaries if summary is not None]
+
+def _parse_verdict(result) -> Tuple[str, str]:
+    result_str = _result_text(result)
     # Try to parse result as JSON
     try:
-        if hasattr(result, "content"):
-            result_str = result.content
-        elif isinstance(result, str):
-            result_str = result
-        else:
-            result_str = str(result)
         json_start = result_str.find('{')
         json_end = result_str.rfind('}') + 1
         json_str = result_str[json_start:json_end]
@@ -143,7 +153,103 @@ Respond ONLY in the following JSON format:
         explanation = result_str
     return verdict, explanation
 
+def _combine_evidence(all_evidence_texts) -> str:
+    return "\n\n".join(all_evidence_texts[:20])[:45000]
+
+def get_final_verdict_from_llm(claim, all_evidence_texts) -> Tuple[str, str]:
+    result = verdict_chain.invoke({"claim": claim, "evidence": _combine_evidence(all_evidence_texts)})
+    return _parse_verdict(result)
+
+@timed("verdict")
+async def async_get_final_verdict_from_llm(claim, all_evidence_texts) -> Tuple[str, str]:
+    result = await verdict_chain.ainvoke({"claim": claim, "evidence": _combine_evidence(all_evidence_texts)})
+    return _parse_verdict(result)
+
+# Identical claims being verified at the same time share one run
+_claim_flights = SingleFlight()
+
+def _claim_key(claim: str) -> str:
+    return " ".join(claim.lower().split())
+
+# Streaming runs in progress by claim key; blocking callers join them too
+_claim_streams = {}
+
 async def handle_claim_verification(claim: str) -> Tuple[str, str]:
+    key = _claim_key(claim)
+    run = _claim_streams.get(key)
+    if run is not None:
+        # A blocking caller keeps the run alive even if its streaming clients leave
+        run.shared = True
+        return await asyncio.shield(run.task)
+    return await _claim_flights.do(key, lambda: _handle_claim_verification(claim))
+
+@timed("claim_verification")
+async def _handle_claim_verification(claim: str) -> Tuple[str, str]:
     evidence = await run_all_sources_with_summary(claim)
-    verdict, explanation = get_final_verdict_from_llm(claim, evidence)
-    return verdict, explanation 
\ No newline at end of file
+    verdict, explanation = await async_get_final_verdict_from_llm(claim, evidence)
+    return verdict, explanation
+
+async def stream_claim_verification(claim: str) -> AsyncIterator[dict]:
+    """Same pipeline as handle_claim_verification, yielding events per stage.
+
+    Identical claims streamed at the same time share one run. The run is
+    cancelled when its last client disconnects, unless a blocking caller joined.
+    """
+    key = _claim_key(claim)
+    run = _claim_streams.get(key)
+    if run is None and _claim_flights.in_flight(key):
+        # A blocking run is already verifying it, wait for its verdict
+        verdict, explanation = await handle_claim_verification(claim)
+        yield {"event": "verdict", "verdict": verdict, "explanation": explanation}
+        return
+    if run is None:
+        run = Broadcast()
+        _claim_streams[key] = run
+        run.task = asyncio.ensure_future(_stream_claim(key, claim, run))
+    queue = run.subscribe()
+    finished = False
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        finished = True
+    finally:
+        run.unsubscribe(queue)
+        if not finished and not run.subscribers and not run.shared:
+            run.task.cancel()
+    await run.task
+
+async def _stream_claim(key: str, claim: str, run: Broadcast) -> Tuple[str, str]:
+    summaries = []
+    try:
+        with track("claim_verification"):
+            all_urls = await async_gather_source_urls(claim)
+            run.publish({"event": "sources", "urls": all_urls})
+
+            async def summarize(url):
+                return url, await scrape_and_summarize(url)
+
+            summaries = [asyncio.ensure_future(summarize(url)) for url in all_urls]
+            evidence = []
+            for next_done in asyncio.as_completed(summaries):
+                url, summary = await next_done
+                if summary is None:
+                    continue
+                evidence.append(summary)
+                run.publish({"event": "summary", "url": url, "summary": summary})
+
+            chunks = []
+            with track("verdict"):
+                async for chunk in verdict_chain.astream({"claim": claim, "evidence": _combine_evidence(evidence)}):
+                    text = _result_text(chunk)
+                    if text:
+                        chunks.append(text)
+                        run.publish({"event": "token", "text": text})
+            verdict, explanation = _parse_verdict("".join(chunks))
+            run.publish({"event": "verdict", "verdict": verdict, "explanation": explanation})
+            return verdict, explanation
+    finally:
+        for task in summaries:
+            task.cancel()
+        run.publish(None)
+        if _claim_streams.get(key) is run:
+            del _claim_streams[key]
@@ -0,0 +1,186 @@
+import asyncio
+import base64
+import binascii
+import logging
+import time
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from config import Config
+from utils.database import db
+from utils.singleflight import SingleFlight
+from services.news_service import rank_articles_for_user, deduplicate_articles_for_user
+
+logger = logging.getLogger(__name__)
+
+# Materialized per-user feed: the background ranker writes an ordered list of
+# article ids into feed_queues, and GET /news only advances the queue head.
+#
+#   {"_id": user_id, "items": [article_id, ...], "head": 0, "version": ObjectId, "built_at": datetime}
+
+_refresh_flights = SingleFlight()
+_background_tasks = set()
+_last_crawl = {}
+
+# Scheduled refreshes: at most one worker per user and BACKGROUND_CONCURRENCY
+# ranking at once. A request made while the user's refresh is running marks
+# them dirty, and the worker ranks once more afterwards instead of returning
+# the in-progress (possibly stale) result. Maps user_id -> allow_crawl.
+_dirty = {}
+_workers = {}
+_refresh_slots = asyncio.Semaphore(Config.BACKGROUND_CONCURRENCY)
+
+async def refresh_feed_queue(user_id: str, allow_crawl: bool = False):
+    return await _refresh_flights.do(user_id, lambda: _refresh_feed_queue(user_id, allow_crawl))
+
+async def _refresh_feed_queue(user_id: str, allow_crawl: bool):
+    items = await _rebuild_queue(user_id)
+    if not items and allow_crawl and _crawl_allowed(user_id):
+        # Nothing left to rank, fetch new articles and re-rank them here: the
+        # refresh that ingest schedules would only join this in-flight one
+        await deduplicate_articles_for_user(user_id)
+        items = await _rebuild_queue(user_id)
+    return items
+
+async def _rebuild_queue(user_id: str):
+    ranked = await rank_articles_for_user(user_id, limit=Config.FEED_QUEUE_SIZE, candidates=Config.FEED_CANDIDATES)
+    items = [str(article["_id"]) for article, _ in ranked]
+    await db.db.feed_queues.replace_one(
+        {"_id": user_id},
+        {"items": items, "head": 0, "version": ObjectId(), "built_at": datetime.utcnow()},
+        upsert=True
+    )
+    return items
+
+def _crawl_allowed(user_id: str) -> bool:
+    now = time.monotonic()
+    if now - _last_crawl.get(user_id, float("-inf")) < Config.FEED_CRAWL_COOLDOWN:
+        return False
+    _last_crawl[user_id] = now
+    return True
+
+def schedule_feed_refresh(user_id: str, allow_crawl: bool = False):
+    _dirty[user_id] = _dirty.get(user_id, False) or allow_crawl
+    if user_id in _workers:
+        return
+    task = asyncio.create_task(_refresh_worker(user_id))
+    _workers[user_id] = task
+    _background_tasks.add(task)
+    task.add_done_callback(_finish_background_task)
+
+async def _refresh_worker(user_id: str):
+    try:
+        while user_id in _dirty:
+            async with _refresh_slots:
+                # Requests that arrived while waiting for a slot are served by this run
+                allow_crawl = _dirty.pop(user_id, False)
+                try:
+                    await refresh_feed_queue(user_id, allow_crawl)
+                except Exception as e:
+                    logger.error(f"Feed refresh failed for {user_id}: {str(e)}")
+    finally:
+        _workers.pop(user_id, None)
+
+async def wait_for_refreshes():
+    """Wait for scheduled refreshes, including any they schedule in turn."""
+    while _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+
+def _finish_background_task(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Feed refresh failed: {task.exception()}")
+
+async def pop_next_article(user_id: str, projection: dict = None):
+    """Return the next unseen article from the user's queue and mark it seen."""
+    for _ in range(Config.FEED_POP_ATTEMPTS):
+        queue = await db.db.feed_queues.find_one_and_update(
+            {"_id": user_id},
+            {"$inc": {"head": 1}},
+            projection={"items": 1, "head": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not queue or queue["head"] >= len(queue["items"]):
+            break
+        remaining = len(queue["items"]) - queue["head"] - 1
+        if remaining < Config.FEED_QUEUE_LOW_WATER:
+            schedule_feed_refresh(user_id, allow_crawl=True)
+        article = await db.db.articles.find_one_and_update(
+            {"_id": ObjectId(queue["items"][queue["head"]]), "user_id": user_id, "seen": False},
+            {"$set": {"seen": True}},
+            projection=projection
+        )
+        if article:
+            return article
+        # Deleted or already seen since the queue was built, try the next one
+    schedule_feed_refresh(user_id, allow_crawl=True)
+    # Queue is empty or stale: serve the newest unseen article until the ranker catches up
+    return await db.db.articles.find_one_and_update(
+        {"user_id": user_id, "seen": False},
+        {"$set": {"seen": True}},
+        projection=projection,
+        sort=[("published", -1)]
+    )
+
+def encode_cursor(version, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        version, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return ObjectId(version), int(offset)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+async def _claim_page(user_id: str, limit: int, cursor: str = None):
+    """Reserve the next `limit` queue slots; returns (queue, start) or (None, 0)."""
+    projection = {"items": 1, "head": 1, "version": 1}
+    if cursor:
+        version, offset = decode_cursor(cursor)
+        queue = await db.db.feed_queues.find_one_and_update(
+            {"_id": user_id, "version": version},
+            {"$max": {"head": offset + limit}},
+            projection=projection,
+            return_document=ReturnDocument.BEFORE
+        )
+        if queue:
+            return queue, offset
+        # The queue was re-ranked since the cursor was issued, continue from its head
+    queue = await db.db.feed_queues.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"head": limit}},
+        projection=projection,
+        return_document=ReturnDocument.BEFORE
+    )
+    return queue, queue["head"] if queue else 0
+
+async def next_feed_page(user_id: str, limit: int, cursor: str = None, projection: dict = None):
+    """Return the next `limit` ranked unseen articles and the cursor for the page after.
+
+    Returned articles are marked seen with a single update_many.
+    """
+    queue, start = await _claim_page(user_id, limit, cursor)
+    items = queue["items"] if queue else []
+    page_ids = [ObjectId(i) for i in items[start:start + limit]]
+    articles = []
+    if page_ids:
+        found = await db.db.articles.find(
+            {"_id": {"$in": page_ids}, "user_id": user_id, "seen": False}, projection
+        ).to_list(length=limit)
+        by_id = {a["_id"]: a for a in found}
+        articles = [by_id[i] for i in page_ids if i in by_id]
+    end = start + limit
+    next_cursor = encode_cursor(queue["version"], end) if queue and end < len(items) else None
+    if len(items) - end < Config.FEED_QUEUE_LOW_WATER:
+        schedule_feed_refresh(user_id, allow_crawl=True)
+    if not articles and not page_ids:
+        # Queue is empty: serve the newest unseen articles until the ranker catches up
+        articles = await db.db.articles.find(
+            {"user_id": user_id, "seen": False}, projection
+        ).sort("published", -1).limit(limit).to_list(length=limit)
+    if articles:
+        await db.db.articles.update_many(
+            {"_id": {"$in": [a["_id"] for a in articles]}},
+            {"$set": {"seen": True}}
+        )
+    return articles, next_cursor
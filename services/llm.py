@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from config import Config
+from utils.metrics import LLMMetricsCallback
+
+# Shared LLM client registry. Clients are built lazily on first use and reused
+# across calls, so the underlying HTTP connection pool is reused as well.
+# Factories can be swapped (e.g. for a local stub in benchmarks and tests).
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def _groq_factory():
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model=Config.GROQ_MODEL,
+        temperature=0.2,
+        api_key=Config.GROQ_API_KEY,
+    )
+
+
+def _stub_factory():
+    return StubChatModel(latency=Config.LLM_STUB_LATENCY)
+
+
+_PROVIDERS = {
+    "groq": _groq_factory,
+    "stub": _stub_factory,
+}
+
+
+def register_llm(factory: Callable[[], Any], name: str = "default"):
+    """Register a factory for the named client and drop any cached instance."""
+    with _lock:
+        _factories[name] = factory
+        _clients.pop(name, None)
+
+
+def set_llm(llm, name: str = "default"):
+    """Install a ready-made client (e.g. a stub) under the given name."""
+    register_llm(lambda: llm, name)
+
+
+def reset_llms():
+    with _lock:
+        _clients.clear()
+
+
+def get_llm(name: str = "default"):
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        if name not in _clients:
+            factory = _factories.get(name) or _PROVIDERS[Config.LLM_PROVIDER]
+            _clients[name] = _instrument(factory())
+        return _clients[name]
+
+
+def _instrument(client):
+    # Time every call made through the client, including those inside agents
+    if isinstance(client, BaseChatModel):
+        client.callbacks = [*(client.callbacks or []), LLMMetricsCallback(client._llm_type)]
+    return client
+
+
+class LazyLLM(Runnable):
+    """Runnable that resolves the registered client at call time.
+
+    Lets prompt chains be composed once at import time while the actual
+    client stays lazily created and replaceable.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        return get_llm(self.name).invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        return await get_llm(self.name).ainvoke(input, config, **kwargs)
+
+    def stream(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        yield from get_llm(self.name).stream(input, config, **kwargs)
+
+    async def astream(self, input, config: Optional[RunnableConfig] = None, **kwargs):
+        async for chunk in get_llm(self.name).astream(input, config, **kwargs):
+            yield chunk
+
+
+lazy_llm = LazyLLM()
+
+
+class StubChatModel(BaseChatModel):
+    """Local stand-in for the Groq client with a configurable latency.
+
+    Answers are shaped so both the verdict parser and the ReAct agent accept
+    them, which makes it usable for benchmarks and offline runs.
+    """
+
+    latency: float = 0.0
+    response: str = '{"verdict": "REAL", "explanation": "Stub verdict."}'
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = messages[-1].content if messages else ""
+        if "Final Answer" in prompt:
+            return f"Thought: I now know the final answer\nFinal Answer: {self.response}"
+        return self.response
+
+    def _generate(self, messages: List[BaseMessage], stop=None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = AIMessage(content=self._reply(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = AIMessage(content=self._reply(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
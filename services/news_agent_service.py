@@ -3,30 +3,25 @@ from datetime import datetime, timedelta
 from config import Config
 from model.article import NewsAgentSession
 from utils.database import db
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
 from langchain.agents import initialize_agent, Tool
+from services.llm import get_llm
+from services import agent_memory
+from utils.singleflight import SingleFlight, Broadcast
+from utils.content_codec import article_content, ensure_dictionaries
+from utils.metrics import timed, CACHE_LOOKUPS
 # from langchain_community.tools import DuckDuckGoSearchRun, WikipediaQueryRun
 # from duckduckgo_search import DDGS
 # import wikipedia
 # from duckduckgo_search.exceptions import DuckDuckGoSearchException
 import asyncio
 from bson import ObjectId
+from typing import AsyncIterator
+import logging
 
-# Ensure TTL index exists
-async def ensure_ttl_index():
-    await db.db.news_sessions.create_index("last_accessed", expireAfterSeconds=600)
+logger = logging.getLogger(__name__)
 
-# Helper: get Groq LLM
-def get_groq_llm():
-    return ChatGroq(
-        model="gemma2-9b-it",
-        temperature=0.2,
-        api_key=Config.GROQ_API_KEY,
-    )
-
-# Helper: get tools
-async def get_tools():
+# Helper: build tools (once, at module load)
+def _build_tools():
     tools = []
     # DuckDuckGo tool with error handling
     # def safe_ddg(q):
@@ -67,9 +62,10 @@ async def get_tools():
     if not tools:
         # Fallback tool: use only LLM
         def llm_only_tool(q):
-            llm = get_groq_llm()
+            llm = get_llm()
             prompt = f"Answer the following question using your own knowledge and reasoning.\nQuestion: {q}"
-            return llm.invoke(prompt) if hasattr(llm, 'invoke') else llm(q)
+            result = llm.invoke(prompt)
+            return getattr(result, "content", result)
         tools.append(Tool(
             name="LLMOnly",
             func=llm_only_tool,
@@ -77,8 +73,42 @@ async def get_tools():
         ))
     return tools
 
-async def start_news_agent_session(article_id: str):
-    await ensure_ttl_index()
+TOOLS = _build_tools()
+
+async def get_tools():
+    return TOOLS
+
+# Helper: get the agent, rebuilt only when the registered LLM changes
+_agent_cache = {}
+
+def get_agent():
+    llm = get_llm()
+    cached = _agent_cache.get("default")
+    if cached is None or cached[0] is not llm:
+        agent = initialize_agent(TOOLS, llm, agent="zero-shot-react-description", verbose=False)
+        cached = (llm, agent)
+        _agent_cache["default"] = cached
+    return cached[1]
+
+@timed("agent_run")
+async def run_agent(prompt: str) -> str:
+    result = await get_agent().ainvoke({"input": prompt})
+    return result["output"]
+
+async def stream_agent(prompt: str) -> AsyncIterator[dict]:
+    """Run the agent, yielding token/tool events and finally its output."""
+    async for event in get_agent().astream_events({"input": prompt}, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = getattr(event["data"].get("chunk"), "content", "")
+            if text:
+                yield {"event": "token", "text": text}
+        elif kind == "on_tool_start":
+            yield {"event": "tool", "name": event["name"]}
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            yield {"event": "output", "text": event["data"]["output"]["output"]}
+
+async def find_article(article_id: str):
     # Try to convert article_id to ObjectId if possible
     try:
         obj_id = ObjectId(article_id)
@@ -87,29 +117,39 @@ async def start_news_agent_session(article_id: str):
         article = await db.db.articles.find_one({"_id": article_id})
     if not article:
         raise ValueError("Article not found")
-    llm = get_groq_llm()
-    tools = await get_tools()
-    agent = initialize_agent(tools, llm, agent="zero-shot-react-description", verbose=False)
-    # Compose the prompt for timeline and analysis
-    prompt = f"""
+    await ensure_dictionaries([article])
+    return article
+
+async def find_session(session_id: str):
+    session = await db.db.news_sessions.find_one({"session_id": session_id})
+    if not session:
+        raise ValueError("Session not found or expired")
+    return session
+
+def _start_prompt(article) -> str:
+    return f"""
 Given the following news article:
 Title: {article.get('title', '')}
-Content: {article.get('content', '')}
+Content: {article_content(article) or ''}
 
 1. Provide a timeline of the news from its start to the present.
 2. Explain how it is affecting lives, who is benefiting, and all relevant context.
 Be as comprehensive as possible, using web and Wikipedia search as needed.
 """
-    result = await asyncio.get_event_loop().run_in_executor(None, lambda: agent.run(prompt))
+
+async def _create_session(article_id: str, prompt: str, result: str) -> str:
     session_id = str(uuid.uuid4())
     now = datetime.utcnow()
+    # The opening prompt and answer are kept apart from the rolling history
+    # so they survive when older turns are summarized away
     context = {
         "timeline": result,
         "analysis": result,
-        "history": [
-            {"role": "system", "content": prompt},
-            {"role": "assistant", "content": result}
-        ]
+        "background": prompt,
+        "summary": "",
+        "history": [],
+        "turns": 0,
+        "prompt_tokens_total": 0
     }
     session = NewsAgentSession(
         session_id=session_id,
@@ -118,25 +158,141 @@ Be as comprehensive as possible, using web and Wikipedia search as needed.
         last_accessed=now
     )
     await db.db.news_sessions.insert_one(session.dict())
+    return session_id
+
+def _follow_up_prompt(session, question: str) -> str:
+    return agent_memory.build_prompt(session["context"], question)
+
+async def _record_turn(session, question: str, answer: str, prompt: str):
+    context = session["context"]
+    prompt_tokens = agent_memory.estimate_tokens(prompt)
+    turn = context.get("turns", 0) + 1
+    new_messages = [
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer}
+    ]
+    evicted, _ = agent_memory.split_overflow(context.get("history", []), new_messages)
+    summary = await agent_memory.roll_summary(context.get("summary", ""), evicted)
+    now = datetime.utcnow()
+    # Append instead of rewriting the history; $slice keeps only the window
+    await db.db.news_sessions.update_one(
+        {"session_id": session["session_id"]},
+        {
+            "$push": {
+                "context.history": {"$each": new_messages, "$slice": -agent_memory.window_size()},
+                "context.usage": {
+                    "$each": [{"turn": turn, "prompt_tokens": prompt_tokens, "at": now}],
+                    "$slice": -Config.NEWS_AGENT_USAGE_HISTORY
+                }
+            },
+            "$set": {"context.summary": summary, "last_accessed": now},
+            "$inc": {"context.turns": 1, "context.prompt_tokens_total": prompt_tokens}
+        }
+    )
+    logger.info(f"News agent session {session['session_id']} turn {turn}: ~{prompt_tokens} prompt tokens")
+
+# Per-article cache of the timeline/analysis. Every user has their own copy of
+# an article, so the cache is keyed by URL to share one agent run between them.
+_agent_flights = SingleFlight()
+
+def _cache_key(article) -> str:
+    return article.get("url") or str(article["_id"])
+
+async def _cached_analysis(key: str):
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.NEWS_AGENT_CACHE_TTL)
+    doc = await db.db.news_agent_cache.find_one({"_id": key, "created_at": {"$gte": cutoff}})
+    return doc["analysis"] if doc else None
+
+async def _store_analysis(key: str, article_id: str, result: str):
+    await db.db.news_agent_cache.replace_one(
+        {"_id": key},
+        {"article_id": str(article_id), "timeline": result, "analysis": result, "created_at": datetime.utcnow()},
+        upsert=True
+    )
+
+# Streaming runs in progress by cache key, shared by every client asking for the same article
+_streamed_runs = {}
+
+async def _stream_and_cache(key: str, article_id: str, prompt: str, run: Broadcast) -> str:
+    try:
+        result = ""
+        async for event in stream_agent(prompt):
+            if event["event"] == "output":
+                result = event["text"]
+            else:
+                run.publish(event)
+        await _store_analysis(key, article_id, result)
+        return result
+    finally:
+        run.publish(None)
+        _streamed_runs.pop(key, None)
+
+def _start_streamed_run(key: str, article_id: str, prompt: str) -> Broadcast:
+    run = Broadcast()
+    _streamed_runs[key] = run
+    # Registered as the article's agent flight, so blocking callers join it too
+    run.task = asyncio.ensure_future(_agent_flights.do(key, lambda: _stream_and_cache(key, article_id, prompt, run)))
+    return run
+
+async def _run_and_cache(key: str, article_id: str, prompt: str) -> str:
+    result = await run_agent(prompt)
+    await _store_analysis(key, article_id, result)
+    return result
+
+async def get_article_analysis(article_id: str, article, prompt: str) -> str:
+    key = _cache_key(article)
+    cached = await _cached_analysis(key)
+    CACHE_LOOKUPS.labels("news_agent", "hit" if cached is not None else "miss").inc()
+    if cached is not None:
+        return cached
+    # Concurrent requests for the same article share one agent run
+    return await _agent_flights.do(key, lambda: _run_and_cache(key, article_id, prompt))
+
+async def start_news_agent_session(article_id: str):
+    article = await find_article(article_id)
+    # Compose the prompt for timeline and analysis
+    prompt = _start_prompt(article)
+    result = await get_article_analysis(article_id, article, prompt)
+    session_id = await _create_session(article_id, prompt, result)
     return session_id, result, result
 
+async def stream_news_agent_session(article_id: str, article) -> AsyncIterator[dict]:
+    prompt = _start_prompt(article)
+    key = _cache_key(article)
+    result = await _cached_analysis(key)
+    if result is None:
+        run = _streamed_runs.get(key)
+        if run is None and not _agent_flights.in_flight(key):
+            run = _start_streamed_run(key, article_id, prompt)
+        if run is None:
+            # A blocking run is already generating it, wait for its result
+            result = await get_article_analysis(article_id, article, prompt)
+        else:
+            queue = run.subscribe()
+            try:
+                while (event := await queue.get()) is not None:
+                    yield event
+            finally:
+                run.unsubscribe(queue)
+            result = await run.task
+    session_id = await _create_session(article_id, prompt, result)
+    yield {"event": "done", "session_id": session_id, "timeline": result, "analysis": result}
+
 async def follow_up_news_agent_session(session_id: str, question: str):
-    session = await db.db.news_sessions.find_one({"session_id": session_id})
-    if not session:
-        raise ValueError("Session not found or expired")
-    llm = get_groq_llm()
-    tools = await get_tools()
-    agent = initialize_agent(tools, llm, agent="zero-shot-react-description", verbose=False)
+    session = await find_session(session_id)
     # Compose the prompt with full context
-    history = session["context"].get("history", [])
-    context_str = "\n".join([f"{h['role']}: {h['content']}" for h in history])
-    prompt = f"Context so far:\n{context_str}\n\nFollow-up question: {question}\nAnswer in detail."
-    answer = await asyncio.get_event_loop().run_in_executor(None, lambda: agent.run(prompt))
-    # Update session context and last_accessed
-    history.append({"role": "user", "content": question})
-    history.append({"role": "assistant", "content": answer})
-    await db.db.news_sessions.update_one(
-        {"session_id": session_id},
-        {"$set": {"context.history": history, "last_accessed": datetime.utcnow()}}
-    )
-    return session_id, answer 
\ No newline at end of file
+    prompt = _follow_up_prompt(session, question)
+    answer = await run_agent(prompt)
+    await _record_turn(session, question, answer, prompt)
+    return session_id, answer
+
+async def stream_follow_up_session(session, question: str) -> AsyncIterator[dict]:
+    prompt = _follow_up_prompt(session, question)
+    answer = ""
+    async for event in stream_agent(prompt):
+        if event["event"] == "output":
+            answer = event["text"]
+        else:
+            yield event
+    await _record_turn(session, question, answer, prompt)
+    yield {"event": "done", "session_id": session["session_id"], "answer": answer}
@@ -7,9 +7,14 @@ from utils.faiss_manager import faiss_manager
 from utils.database import db
 from services.recommender import embed_text
 from bs4 import BeautifulSoup
+from utils.singleflight import SingleFlight
+from utils.metrics import timed, ARTICLES_FETCHED
 
 logger = logging.getLogger(__name__)
 
+_crawl_flights = SingleFlight()
+
+@timed("extract")
 async def extract_full_article(session: aiohttp.ClientSession, url: str) -> str:
     """Extract main text content from article URL"""
     try:
@@ -36,6 +41,7 @@ async def extract_full_article(session: aiohttp.ClientSession, url: str) -> str:
         logger.exception(f"Unexpected error parsing {url}")
     return None
 
+@timed("crawl_rss")
 async def fetch_rss_articles(source_name: str, rss_url: str) -> list:
     """Fetch and parse RSS feed articles asynchronously"""
     try:
@@ -50,7 +56,9 @@ async def fetch_rss_articles(source_name: str, rss_url: str) -> list:
                         tasks.append(process_rss_entry(session, source_name, entry))
                 
                 results = await asyncio.gather(*tasks)
-                return [article for article in results if article]
+                articles = [article for article in results if article]
+                ARTICLES_FETCHED.labels(source_name).inc(len(articles))
+                return articles
     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"RSS fetch failed for {source_name}: {str(e)}")
     return []
@@ -79,10 +87,11 @@ async def process_rss_entry(session: aiohttp.ClientSession, source_name: str, en
         logger.exception(f"Error processing RSS entry: {entry.title}")
         return None
 
+@timed("crawl_gnews")
 async def fetch_gnews_articles() -> list:
     """Fetch articles from GNews API"""
     try:
-        url = f"https://gnews.io/api/v4/top-headlines?country=in&max=20&token={Config.GNEWS_API_KEY}"
+        url = f"{Config.GNEWS_URL}?country=in&max=20&token={Config.GNEWS_API_KEY}"
         async with aiohttp.ClientSession() as session:
             async with session.get(url) as response:
                 data = await response.json()
@@ -93,7 +102,9 @@ async def fetch_gnews_articles() -> list:
                         tasks.append(process_gnews_item(session, item))
                 
                 results = await asyncio.gather(*tasks)
-                return [article for article in results if article]
+                articles = [article for article in results if article]
+                ARTICLES_FETCHED.labels("gnews").inc(len(articles))
+                return articles
     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"GNews fetch failed: {str(e)}")
     except Exception as e:
@@ -121,6 +132,14 @@ async def process_gnews_item(session: aiohttp.ClientSession, item: dict) -> dict
         return None
 
 async def fetch_all_articles() -> list:
+    """Fetch articles from all sources, sharing one crawl between concurrent callers.
+
+    The returned list (and its dicts) may be shared, callers must copy before mutating.
+    """
+    return await _crawl_flights.do("all", _fetch_all_articles)
+
+@timed("crawl")
+async def _fetch_all_articles() -> list:
     """Fetch articles from all sources concurrently"""
     try:
         rss_tasks = [
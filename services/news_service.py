@@ -1,119 +1,215 @@
 from utils.database import db
-from utils.faiss_manager import faiss_manager
-from services.recommender import embed_text, is_similar, recommend_similar
+from utils.faiss_manager import faiss_manager, faiss_id
+from services.recommender import async_embed_texts, is_similar, recommend_similar, SIMILARITY_THRESHOLD
 from jose import jwt
 import os
 import numpy as np
 import logging
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timedelta
 import pytz
 import asyncio
 from services.fake_news_service import handle_claim_verification
+from services import user_profile
+from config import Config
+from utils.singleflight import SingleFlight
+from utils.metrics import timed, track, ARTICLES_INGESTED
+from utils.embedding_codec import encode_embedding, decode_embedding, decode_embeddings
+from utils.content_codec import prepare_content, load_dictionaries, enabled as content_codec_enabled
 
 logger = logging.getLogger(__name__)
 
 IST = pytz.timezone('Asia/Kolkata')
 
-async def deduplicate_articles():
+# Global and per-user ingestion must never run twice at once for the same target
+_dedup_flights = SingleFlight()
+
+def _article_text(article) -> str:
+    return article["title"] + " " + article["content"]
+
+async def _insert_articles(docs):
+    if not docs:
+        return
+    try:
+        await db.db.articles.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # ordered=False keeps going past individual failures, report and move on
+        logger.error(f"Bulk insert of {len(docs)} articles had {len(e.details.get('writeErrors', []))} errors")
+
+def _add_to_index(index, docs, embeddings):
+    with track("faiss_add"):
+        index.add_with_ids(
+            np.asarray(embeddings, dtype=np.float32),
+            np.array([faiss_id(doc["_id"]) for doc in docs], dtype=np.int64)
+        )
+
+async def crawl_and_embed():
+    """Fetch the latest articles once and embed them in one batch."""
     from services.news_aggregator import fetch_all_articles
     articles = await fetch_all_articles()
+    embeddings = await async_embed_texts([_article_text(a) for a in articles])
+    # Preview and compression are computed once here, not once per user copy,
+    # with any dictionary trained since the last crawl
+    if content_codec_enabled():
+        await load_dictionaries()
+    loop = asyncio.get_event_loop()
+    articles = await loop.run_in_executor(None, lambda: [prepare_content(a) for a in articles])
+    return articles, embeddings
+
+async def deduplicate_articles(articles=None, embeddings=None):
+    return await _dedup_flights.do("global", lambda: _deduplicate_articles(articles, embeddings))
+
+@timed("dedup_global")
+async def _deduplicate_articles(articles, embeddings):
+    if articles is None:
+        articles, embeddings = await crawl_and_embed()
     global_index = faiss_manager.get_index("global.index")
-    
+    # Same rule as calling is_similar() before adding each article in turn:
+    # compare against the index in one search, then against the accepted batch
+    if global_index.ntotal:
+        with track("faiss_search"):
+            distances, _ = global_index.search(np.asarray(embeddings, dtype=np.float32), 1)
+        nearest = distances[:, 0]
+    else:
+        nearest = np.full(len(articles), np.inf, dtype=np.float32)
+    accepted = []
+    for i in range(len(articles)):
+        distance = nearest[i]
+        if accepted:
+            distance = min(distance, float(np.min(np.sum((embeddings[accepted] - embeddings[i]) ** 2, axis=1))))
+        # An empty index never matches, otherwise keep is_similar's threshold rule
+        if np.isinf(distance) or distance < SIMILARITY_THRESHOLD:
+            accepted.append(i)
     new_articles = []
-    for article in articles:
-        embedding = embed_text(article["title"] + " " + article["content"])
-        if not is_similar(embedding, global_index):
-            article["embedding"] = embedding.tolist()
-            article["verified"] = False
-            result = await db.db.articles.insert_one(article)
-            article_id = result.inserted_id
-            faiss_id = int(article_id.binary.hex(), 16) % (2**63)
-            global_index.add_with_ids(
-                np.array([embedding], dtype=np.float32),
-                np.array([faiss_id], dtype=np.int64)
-            )
-            new_articles.append(article)
-    
+    for i in accepted:
+        article = dict(articles[i])
+        # The search corpus keeps plain content, the $text index covers it
+        article.pop("content_z", None)
+        article["_id"] = ObjectId()
+        # Stored so search can map global.index hits back to articles
+        article["faiss_id"] = faiss_id(article["_id"])
+        article["embedding"] = encode_embedding(embeddings[i])
+        article["verified"] = False
+        new_articles.append(article)
+    await _insert_articles(new_articles)
+    ARTICLES_INGESTED.labels("global").inc(len(new_articles))
+    if new_articles:
+        _add_to_index(global_index, new_articles, embeddings[accepted])
     faiss_manager.save_index("global.index", global_index)
     return new_articles
 
-async def deduplicate_articles_for_user(user_id):
-    from services.news_aggregator import fetch_all_articles
-    articles = await fetch_all_articles()
-    user_index = faiss_manager.get_index(f"user_{user_id}.index")
+async def deduplicate_articles_for_user(user_id, articles=None, embeddings=None):
+    return await _dedup_flights.do(("user", user_id), lambda: _deduplicate_articles_for_user(user_id, articles, embeddings))
+
+@timed("dedup_user")
+async def _deduplicate_articles_for_user(user_id, articles, embeddings):
+    if articles is None:
+        articles, embeddings = await crawl_and_embed()
+    fetched_at = datetime.now(IST)
     new_articles = []
-    for article in articles:
-        embedding = embed_text(article["title"] + " " + article["content"])
-        article["embedding"] = embedding.tolist()
+    for article, embedding in zip(articles, embeddings):
+        if "content_preview" not in article:
+            article = prepare_content(article)
+        article = dict(article)
+        if "content_z" in article:
+            # Per-user copies keep only the compressed body
+            article.pop("content", None)
+        article["_id"] = ObjectId()
+        article["embedding"] = encode_embedding(embedding)
         article["user_id"] = user_id
         article["seen"] = False
-        article["fetched_at"] = datetime.now(IST)
+        article["fetched_at"] = fetched_at
         article["verified"] = False
-        result = await db.db.articles.insert_one(article)
-        article_id = result.inserted_id
-        faiss_id = int(article_id.binary.hex(), 16) % (2**63)
-        user_index.add_with_ids(
-            np.array([embedding], dtype=np.float32),
-            np.array([faiss_id], dtype=np.int64)
-        )
         new_articles.append(article)
-    faiss_manager.save_index(f"user_{user_id}.index", user_index)
+    await _insert_articles(new_articles)
+    ARTICLES_INGESTED.labels("user").inc(len(new_articles))
+    if Config.USER_INDEX_ENABLED and new_articles:
+        user_index = faiss_manager.get_index(f"user_{user_id}.index")
+        _add_to_index(user_index, new_articles, embeddings)
+        faiss_manager.save_index(f"user_{user_id}.index", user_index)
+    # New articles arrived, re-rank the user's feed queue. Not awaited: a
+    # crawling refresh may be the caller, and awaiting its flight would deadlock
+    from services.feed_queue import schedule_feed_refresh
+    schedule_feed_refresh(user_id)
     return new_articles
 
-async def get_news_for_user(user_id: str, category: str = None, source: str = None, _refresh: bool = True):
-    user_index = faiss_manager.get_index(f"user_{user_id}.index")
+@timed("rank")
+async def rank_articles_for_user(user_id: str, category: str = None, source: str = None, limit: int = 10, candidates: int = 100):
     # Only show articles that are (verified=True and seen=False) or (verified=False and seen=False)
     query = {"user_id": user_id, "seen": False, "$or": [{"verified": True}, {"verified": False}]}
     if category:
         query["category"] = category
     if source:
         query["source"] = source
-    cursor = db.db.articles.find(query).sort("published", -1).limit(100)
+    # Ranking only needs ids and embeddings, callers load display fields by id
+    cursor = db.db.articles.find(query, {"embedding": 1, "published": 1}).sort("published", -1).limit(candidates)
     read_cursor = db.db.user_reads.find({"user_id": user_id})
     read_ids = set()
     async for read in read_cursor:
         read_ids.add(read["article_id"])
+    articles = [a for a in await cursor.to_list(length=candidates) if str(a["_id"]) not in read_ids]
+    if Config.USER_INDEX_ENABLED:
+        recommendations = _rank_with_user_index(user_id, articles)
+    else:
+        recommendations = await _rank_with_profile(user_id, articles)
+    return sorted(recommendations, key=lambda x: x[1], reverse=True)[:limit]
+
+def _rank_with_user_index(user_id: str, articles):
+    user_index = faiss_manager.get_index(f"user_{user_id}.index")
     recommendations = []
-    for article in await cursor.to_list(length=100):
-        if str(article["_id"]) in read_ids:
-            continue
-        embedding = np.array(article["embedding"], dtype=np.float32)
+    for article in articles:
+        embedding = decode_embedding(article["embedding"])
         if user_index.ntotal == 0 or not is_similar(embedding, user_index, threshold=0.9):
             _, similarities = recommend_similar(embedding, user_index, top_k=1)
             score = similarities[0] if similarities else 0
             recommendations.append((article, score))
-    if not recommendations and _refresh:
-        await deduplicate_articles_for_user(user_id)
-        return await get_news_for_user(user_id, category, source, _refresh=False)
-    if recommendations:
-        await db.db.articles.update_one({"_id": recommendations[0][0]["_id"]}, {"$set": {"seen": True}})
-    return sorted(recommendations, key=lambda x: x[1], reverse=True)[:10]
+    return recommendations
 
+async def _rank_with_profile(user_id: str, articles):
+    # One matrix-vector product for all candidates; cold users (no profile)
+    # score 0 everywhere, which keeps the newest-first candidate order
+    profile = await user_profile.get_profile(user_id)
+    if not articles:
+        return []
+    embeddings = decode_embeddings([a["embedding"] for a in articles])
+    scores = user_profile.score_candidates(profile, embeddings)
+    return list(zip(articles, scores.tolist()))
+
+@timed("track_read")
 async def track_user_read(user_id: str, article_id: str, duration: int):
-    article = await db.db.articles.find_one({"_id": ObjectId(article_id), "user_id": user_id})
+    article = await db.db.articles.find_one({"_id": ObjectId(article_id), "user_id": user_id}, {"embedding": 1})
     if not article:
         return False
-    user_index = faiss_manager.get_index(f"user_{user_id}.index")
-    embedding = np.array(article["embedding"], dtype=np.float32)
-    oid = ObjectId(article_id)
-    faiss_id = int(oid.binary.hex(), 16) % (2**63)
-    user_index.add_with_ids(
-        np.array([embedding], dtype=np.float32),
-        np.array([faiss_id], dtype=np.int64)
-    )
-    faiss_manager.save_index(f"user_{user_id}.index", user_index)
+    embedding = decode_embedding(article["embedding"])
+    await user_profile.record_read(user_id, embedding, duration)
+    if Config.USER_INDEX_ENABLED:
+        user_index = faiss_manager.get_index(f"user_{user_id}.index")
+        user_index.add_with_ids(
+            np.array([embedding], dtype=np.float32),
+            np.array([faiss_id(ObjectId(article_id))], dtype=np.int64)
+        )
+        faiss_manager.save_index(f"user_{user_id}.index", user_index)
     await db.db.user_reads.insert_one({
         "user_id": user_id,
         "article_id": article_id,
         "duration": duration,
         "timestamp": datetime.utcnow()
     })
+    from services.feed_queue import schedule_feed_refresh
+    schedule_feed_refresh(user_id)
     return True
 
+async def delete_old_articles():
+    # One delete across all users instead of one per user; the cutoff is shared
+    cutoff = datetime.now(IST) - timedelta(days=3)
+    # Saved articles are pinned, their saved_articles references point at them
+    result = await db.db.articles.delete_many({"user_id": {"$ne": None}, "fetched_at": {"$lt": cutoff}, "saved": {"$ne": True}})
+    return result.deleted_count
+
 async def delete_old_articles_for_user(user_id):
     cutoff = datetime.now(IST) - timedelta(days=3)
-    result = await db.db.articles.delete_many({"user_id": user_id, "fetched_at": {"$lt": cutoff}})
+    result = await db.db.articles.delete_many({"user_id": user_id, "fetched_at": {"$lt": cutoff}, "saved": {"$ne": True}})
     return result.deleted_count
 
 async def verify_unverified_articles_for_user(user_id):
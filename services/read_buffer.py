@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from config import Config
+from utils.database import db
+from utils.faiss_manager import faiss_manager, faiss_id
+from utils.embedding_codec import decode_embedding
+from utils.metrics import track
+from services import user_profile
+
+logger = logging.getLogger(__name__)
+
+# Write-behind buffer for read events. POST /read/batch only appends to an
+# in-process dict keyed by (user_id, article_id), which collapses duplicate
+# events; a background task flushes it every READ_FLUSH_SECONDS (or sooner
+# when READ_BUFFER_MAX events are pending) as:
+#
+#   one find of all embeddings -> one insert_many into user_reads
+#   -> one bulk profile update -> one add_with_ids + save per user index
+#
+# A batch whose write fails is merged back and retried on the next flush, so
+# delivery is at least once. Events still buffered when the process dies are
+# lost; stop() waits for a running flush and flushes the rest on shutdown.
+
+class ReadBuffer:
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._task = None
+        self._wakeup = None
+        self._flush_lock = asyncio.Lock()
+
+    def add(self, user_id: str, article_id: str, duration: int):
+        self._merge((user_id, article_id), {"duration": duration, "timestamp": datetime.utcnow()})
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _merge(self, key, event):
+        previous = self._pending.get(key)
+        # A repeated event for the same article counts once, with the longest duration
+        if previous is None or event["duration"] > previous["duration"]:
+            self._pending[key] = event
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                with track("read_flush"):
+                    return await self._write(batch)
+            except BaseException:
+                for key, event in batch.items():
+                    self._merge(key, event)
+                raise
+
+    async def _write(self, batch) -> int:
+        articles = await db.db.articles.find(
+            {"_id": {"$in": list({ObjectId(article_id) for _, article_id in batch})}},
+            {"embedding": 1, "user_id": 1}
+        ).to_list(length=len(batch))
+        by_id = {str(a["_id"]): a for a in articles}
+        reads, per_user = [], defaultdict(list)
+        for (user_id, article_id), event in sorted(batch.items(), key=lambda item: item[1]["timestamp"]):
+            article = by_id.get(article_id)
+            if not article or article.get("user_id") != user_id:
+                continue
+            reads.append({"user_id": user_id, "article_id": article_id, **event})
+            per_user[user_id].append((article_id, decode_embedding(article["embedding"]), event["duration"]))
+        if not reads:
+            return 0
+        try:
+            await db.db.user_reads.insert_many(reads, ordered=False)
+        except BulkWriteError as e:
+            logger.error(f"Bulk insert of {len(reads)} reads had {len(e.details.get('writeErrors', []))} errors")
+        await user_profile.record_reads({
+            user_id: [(embedding, duration) for _, embedding, duration in events]
+            for user_id, events in per_user.items()
+        })
+        if Config.USER_INDEX_ENABLED:
+            # On the loop thread like every other index add and search: HNSW
+            # indexes are not safe to add to while another thread uses them
+            _add_to_user_indexes(per_user)
+        from services.feed_queue import schedule_feed_refresh
+        for user_id in per_user:
+            schedule_feed_refresh(user_id)
+        return len(reads)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Read buffer flush failed: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Cancel only between flushes so a batch is never cut off mid-write
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+def _add_to_user_indexes(per_user):
+    # One add_with_ids and one save per user instead of one per read event
+    for user_id, events in per_user.items():
+        path = f"user_{user_id}.index"
+        index = faiss_manager.get_index(path)
+        index.add_with_ids(
+            np.vstack([embedding for _, embedding, _ in events]).astype(np.float32),
+            np.array([faiss_id(ObjectId(article_id)) for article_id, _, _ in events], dtype=np.int64)
+        )
+        faiss_manager.save_index(path, index)
+
+read_buffer = ReadBuffer(Config.READ_FLUSH_SECONDS, Config.READ_BUFFER_MAX)
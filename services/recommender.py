@@ -1,20 +1,54 @@
-from sentence_transformers import SentenceTransformer
 from utils.faiss_manager import faiss_manager
 import numpy as np
+import asyncio
 import logging
+import threading
+from utils.metrics import timed, TEXTS_EMBEDDED
 
 logger = logging.getLogger(__name__)
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """Load the embedding model on first use; importing this module stays cheap."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
+
+@timed("embed")
 def embed_text(text: str):
-    return model.encode(text)
+    TEXTS_EMBEDDED.inc()
+    return get_model().encode(text)
+
+@timed("embed")
+def embed_texts(texts, batch_size: int = 64):
+    # One batched forward pass is much cheaper than encoding texts one by one
+    if not texts:
+        return np.zeros((0, 384), dtype=np.float32)
+    TEXTS_EMBEDDED.inc(len(texts))
+    return np.asarray(get_model().encode(list(texts), batch_size=batch_size), dtype=np.float32)
+
+async def async_embed_texts(texts):
+    # Encoding is CPU-bound, keep it off the event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, embed_texts, texts)
+
+SIMILARITY_THRESHOLD = 0.8
 
-def is_similar(embedding, index, threshold=0.8):
+@timed("faiss_search")
+def is_similar(embedding, index, threshold=SIMILARITY_THRESHOLD):
     if index.ntotal == 0:
         return False
     D, _ = index.search(np.array([embedding]).astype('float32'), 1)
     return D[0][0] >= threshold
 
+@timed("faiss_search")
 def recommend_similar(embedding, index, top_k=5):
     if index.ntotal == 0:
         return [], []
@@ -0,0 +1,102 @@
+import base64
+import binascii
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from utils.database import db
+from utils.mongo_helpers import article_projection, article_to_out
+from utils.content_codec import ensure_dictionaries
+
+# Saved articles are references, not copies:
+#
+#   {"user_id", "article_id", "saved_at", "article": {<SNAPSHOT_FIELDS>}}
+#
+# The snapshot holds what list views display; anything else (e.g. content) is
+# read from the article itself, which is pinned with saved=True so cleanup
+# keeps it. Documents saved before this stored the whole article under
+# "article"; they keep working and scripts/migrate_saved_articles.py slims them.
+
+SNAPSHOT_FIELDS = ("title", "preview", "category", "published", "source", "url", "verified", "verdict")
+SAVED_FIELDS = ("article_id",) + SNAPSHOT_FIELDS
+
+def encode_cursor(saved_at: datetime, doc_id) -> str:
+    return base64.urlsafe_b64encode(f"{saved_at.isoformat()}|{doc_id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        saved_at, doc_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(saved_at), ObjectId(doc_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def snapshot(article) -> dict:
+    return {k: v for k, v in article_to_out(article, SNAPSHOT_FIELDS).items() if v is not None}
+
+async def save_article(user_id: str, article_id: str):
+    """Returns True when saved, False when already saved, None when the article does not exist."""
+    if await db.db.saved_articles.find_one({"user_id": user_id, "article_id": article_id}, {"_id": 1}):
+        return False
+    article = await db.db.articles.find_one_and_update(
+        {"_id": ObjectId(article_id), "user_id": user_id},
+        {"$set": {"saved": True}},
+        projection=article_projection(SNAPSHOT_FIELDS)
+    )
+    if not article:
+        return None
+    try:
+        await db.db.saved_articles.insert_one({
+            "user_id": user_id,
+            "article_id": article_id,
+            "saved_at": datetime.utcnow(),
+            "article": snapshot(article)
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+def _saved_to_out(doc, selected):
+    article = dict(doc.get("article", {}))
+    article.setdefault("_id", doc.get("article_id"))
+    return article_to_out(article, selected)
+
+async def _resolve(user_id: str, docs, selected):
+    """Fill fields the snapshot does not carry from the referenced articles, in one query."""
+    missing = [f for f in selected if f not in SAVED_FIELDS]
+    if not missing or not docs:
+        await ensure_dictionaries([doc.get("article") for doc in docs])
+        return docs
+    ids = [ObjectId(doc["article_id"]) for doc in docs]
+    found = await db.db.articles.find(
+        {"_id": {"$in": ids}, "user_id": user_id}, article_projection(missing)
+    ).to_list(length=len(ids))
+    by_id = {str(a["_id"]): a for a in found}
+    for doc in docs:
+        article = by_id.get(doc["article_id"])
+        if article:
+            # Documents saved as full copies still carry the fields if the article is gone
+            doc.setdefault("article", {}).update({k: v for k, v in article.items() if k != "_id"})
+    await ensure_dictionaries([doc.get("article") for doc in docs])
+    return docs
+
+def _projection(selected) -> dict:
+    # Legacy full copies serve every field from "article."; new snapshots only SAVED_FIELDS
+    return {"article_id": 1, "saved_at": 1, **article_projection(selected, prefix="article.")}
+
+async def list_saved(user_id: str, selected, limit: int, cursor: str = None):
+    """Return one page of saved articles, newest first, and the cursor for the next page."""
+    query = {"user_id": user_id}
+    if cursor:
+        saved_at, doc_id = decode_cursor(cursor)
+        query["$or"] = [{"saved_at": {"$lt": saved_at}}, {"saved_at": saved_at, "_id": {"$lt": doc_id}}]
+    docs = await db.db.saved_articles.find(query, _projection(selected)).sort(
+        [("saved_at", -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]["saved_at"], docs[limit - 1]["_id"]) if len(docs) > limit else None
+    docs = await _resolve(user_id, docs[:limit], selected)
+    return [_saved_to_out(doc, selected) for doc in docs], next_cursor
+
+async def get_saved(user_id: str, article_id: str, selected):
+    doc = await db.db.saved_articles.find_one({"user_id": user_id, "article_id": article_id}, _projection(selected))
+    if not doc:
+        return None
+    return _saved_to_out((await _resolve(user_id, [doc], selected))[0], selected)
@@ -0,0 +1,72 @@
+import asyncio
+import numpy as np
+from utils.database import db
+from utils.faiss_manager import faiss_manager
+from services.recommender import async_embed_texts
+from utils.content_codec import ensure_dictionaries
+
+# Search over articles we already ingested instead of crawling live:
+#   keyword  - Mongo text index on title/content of the global corpus
+#   semantic - query embedding against global.index
+#   hybrid   - reciprocal rank fusion of both lists
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+RRF_K = 60
+
+# Articles without a user_id are the global search corpus; only they store
+# faiss_id, which is what the partial text index can filter on
+GLOBAL_CORPUS = {"user_id": {"$exists": False}, "faiss_id": {"$exists": True}}
+
+SEARCH_PROJECTION = {"title": 1, "content": 1, "content_z": 1, "published": 1, "source": 1, "category": 1, "url": 1}
+
+def _dedupe(articles):
+    # Every user has a copy of the same story, show each URL once
+    seen, unique = set(), []
+    for article in articles:
+        key = article.get("url") or article["_id"]
+        if key not in seen:
+            seen.add(key)
+            unique.append(article)
+    return unique
+
+async def keyword_search(query: str, limit: int):
+    cursor = db.db.articles.find(
+        {"$text": {"$search": query}, **GLOBAL_CORPUS},
+        {**SEARCH_PROJECTION, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return _dedupe(await cursor.to_list(length=limit))
+
+async def semantic_search(query: str, limit: int):
+    index = faiss_manager.get_index("global.index")
+    if index.ntotal == 0:
+        return []
+    embedding = (await async_embed_texts([query]))[0]
+    _, ids = index.search(np.array([embedding], dtype=np.float32), limit)
+    ranked_ids = [int(i) for i in ids[0] if i != -1]
+    if not ranked_ids:
+        return []
+    found = await db.db.articles.find({"faiss_id": {"$in": ranked_ids}}, {**SEARCH_PROJECTION, "faiss_id": 1}).to_list(length=len(ranked_ids))
+    by_id = {a["faiss_id"]: a for a in found if "faiss_id" in a}
+    return _dedupe([by_id[i] for i in ranked_ids if i in by_id])
+
+def fuse(result_lists, limit: int):
+    """Reciprocal rank fusion: score = sum(1 / (RRF_K + rank)) across lists."""
+    scores, articles = {}, {}
+    for results in result_lists:
+        for rank, article in enumerate(results):
+            key = article.get("url") or article["_id"]
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            articles.setdefault(key, article)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [articles[key] for key in ranked[:limit]]
+
+async def search_articles(query: str, mode: str = "hybrid", limit: int = 20):
+    if mode == "keyword":
+        results = await keyword_search(query, limit)
+    elif mode == "semantic":
+        results = await semantic_search(query, limit)
+    else:
+        keyword, semantic = await asyncio.gather(keyword_search(query, limit), semantic_search(query, limit))
+        results = fuse([keyword, semantic], limit)
+    await ensure_dictionaries(results)
+    return results
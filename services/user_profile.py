@@ -0,0 +1,143 @@
+import logging
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+from datetime import datetime
+from config import Config
+from utils.database import db
+from utils.embedding_codec import encode_embedding, decode_embeddings
+
+# Compact interest profile kept on the user document:
+#
+#   profile: {"centroids": [packed float32 vector, ...], "weights": [float, ...],
+#             "updated_at": datetime, "version": ObjectId}
+#
+# Each centroid is an exponentially decayed, read-duration-weighted mean of the
+# normalized embeddings of articles the user read. Scoring a batch of candidates
+# is a single matrix product against the (few) centroids.
+#
+# Updates are read-modify-write, so each write is conditional on the version it
+# read and retried on a conflict. Profiles for reads made before profiles existed
+# are built by scripts/backfill_profiles.py.
+
+logger = logging.getLogger(__name__)
+
+UPDATE_ATTEMPTS = 5
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+def _pack(centroids):
+    # Centroids are few and accumulate over time, keep them at full precision
+    return [encode_embedding(c, codec="f32") for c in centroids]
+
+def read_weight(duration: int) -> float:
+    # Longer reads count more, capped so one long read cannot dominate
+    capped = min(max(duration or 0, 0), Config.PROFILE_DURATION_CAP)
+    return max(capped / Config.PROFILE_DURATION_CAP, Config.PROFILE_MIN_READ_WEIGHT)
+
+def decay_factor(updated_at, now) -> float:
+    if not updated_at:
+        return 1.0
+    elapsed = max((now - updated_at).total_seconds(), 0)
+    return 0.5 ** (elapsed / Config.PROFILE_HALF_LIFE)
+
+def update_profile(profile, embedding, duration: int, now=None):
+    """Fold one read into the profile and return the new profile dict."""
+    now = now or datetime.utcnow()
+    vector = _normalize(np.asarray(embedding, dtype=np.float32))
+    weight = read_weight(duration)
+    if not profile or not profile.get("centroids"):
+        return {"centroids": _pack(vector[None, :]), "weights": [weight], "updated_at": now, "version": ObjectId()}
+    centroids = decode_embeddings(profile["centroids"])
+    weights = np.asarray(profile["weights"], dtype=np.float32) * decay_factor(profile.get("updated_at"), now)
+    similarities = centroids @ vector
+    best = int(np.argmax(similarities))
+    if similarities[best] >= Config.PROFILE_MERGE_THRESHOLD or len(centroids) >= Config.PROFILE_CENTROIDS:
+        merged = (weights[best] * centroids[best] + weight * vector) / (weights[best] + weight)
+        centroids[best] = _normalize(merged)
+        weights[best] += weight
+    else:
+        centroids = np.vstack([centroids, vector])
+        weights = np.append(weights, weight)
+    return {"centroids": _pack(centroids), "weights": weights.tolist(), "updated_at": now, "version": ObjectId()}
+
+def build_profile(reads):
+    """Fold (embedding, duration, timestamp) reads, oldest first, into a new profile."""
+    profile = None
+    for embedding, duration, timestamp in reads:
+        profile = update_profile(profile, embedding, duration, timestamp)
+    return profile
+
+def score_candidates(profile, embeddings):
+    """Weighted cosine similarity of each candidate row to the profile centroids."""
+    if not profile or not profile.get("centroids") or len(embeddings) == 0:
+        return np.zeros(len(embeddings), dtype=np.float32)
+    centroids = decode_embeddings(profile["centroids"])
+    weights = np.asarray(profile["weights"], dtype=np.float32)
+    mix = weights / max(float(weights.sum()), 1e-12)
+    return _normalize(np.asarray(embeddings, dtype=np.float32)) @ centroids.T @ mix
+
+async def get_profile(user_id: str):
+    user = await db.db.users.find_one({"_id": ObjectId(user_id)}, {"profile": 1})
+    return user.get("profile") if user else None
+
+def _unchanged(user_id: str, profile) -> dict:
+    """Filter matching the user only while their profile is still the one read."""
+    if profile and profile.get("version"):
+        return {"_id": ObjectId(user_id), "profile.version": profile["version"]}
+    # No profile yet, or one written before profiles were versioned
+    if profile:
+        return {"_id": ObjectId(user_id), "profile.updated_at": profile.get("updated_at"), "profile.version": {"$exists": False}}
+    return {"_id": ObjectId(user_id), "profile": None}
+
+async def replace_profile(user_id: str, expected, profile) -> bool:
+    """Store `profile` unless the stored one changed since `expected` was read."""
+    result = await db.db.users.update_one(_unchanged(user_id, expected), {"$set": {"profile": profile}})
+    return result.matched_count == 1
+
+async def record_read(user_id: str, embedding, duration: int):
+    for _ in range(UPDATE_ATTEMPTS):
+        current = await get_profile(user_id)
+        profile = update_profile(current, embedding, duration)
+        if await replace_profile(user_id, current, profile):
+            return profile
+    logger.warning(f"Profile update for {user_id} kept conflicting, read not folded in")
+    return None
+
+async def record_reads(reads_by_user):
+    """Fold many reads into many profiles with one find and one bulk write.
+
+    reads_by_user maps user_id to a list of (embedding, duration) in read order.
+    """
+    pending = dict(reads_by_user)
+    now = datetime.utcnow()
+    for _ in range(UPDATE_ATTEMPTS):
+        if not pending:
+            return
+        users = await db.db.users.find(
+            {"_id": {"$in": [ObjectId(u) for u in pending]}}, {"profile": 1}
+        ).to_list(length=len(pending))
+        ops, versions = [], {}
+        for user in users:
+            user_id = str(user["_id"])
+            current = profile = user.get("profile")
+            for embedding, duration in pending[user_id]:
+                profile = update_profile(profile, embedding, duration, now)
+            versions[user_id] = profile["version"]
+            ops.append(UpdateOne(_unchanged(user_id, current), {"$set": {"profile": profile}}))
+        if not ops:
+            return
+        result = await db.db.users.bulk_write(ops, ordered=False)
+        if result.matched_count == len(ops):
+            return
+        # Some profiles changed under us; the ones not holding our version are retried
+        applied = await db.db.users.find(
+            {"_id": {"$in": [ObjectId(u) for u in versions]}, "profile.version": {"$in": list(versions.values())}},
+            {"_id": 1}
+        ).to_list(length=len(versions))
+        done = {str(u["_id"]) for u in applied}
+        pending = {u: pending[u] for u in versions if u not in done}
+    if pending:
+        logger.warning(f"Profile updates for {len(pending)} users kept conflicting, their reads were not folded in")
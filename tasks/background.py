@@ -1,32 +1,49 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from services.news_service import deduplicate_articles_for_user, delete_old_articles_for_user, verify_unverified_articles_global
+from services.news_service import crawl_and_embed, deduplicate_articles, deduplicate_articles_for_user, delete_old_articles, verify_unverified_articles_global
+from config import Config
+from utils.profiling import profiled
+from utils.leader import leader
 import logging
 import asyncio
 
 logger = logging.getLogger(__name__)
 scheduler = AsyncIOScheduler()
 
+async def _for_each_user(user_ids, fn):
+    # Run fn over users concurrently, bounded so Mongo and the CPU are not swamped
+    semaphore = asyncio.Semaphore(Config.BACKGROUND_CONCURRENCY)
+    async def run(user_id):
+        async with semaphore:
+            try:
+                return await fn(user_id)
+            except Exception as e:
+                logger.error(f"Background job failed for user {user_id}: {str(e)}")
+    return await asyncio.gather(*(run(user_id) for user_id in user_ids))
+
 @scheduler.scheduled_job('interval', minutes=30)
+@profiled("periodic_deduplication")
 async def periodic_deduplication():
     try:
         from utils.database import db
         user_ids = await db.db.users.distinct('_id')
-        total_new = 0
-        for user_id in user_ids:
-            new_articles = await deduplicate_articles_for_user(str(user_id))
-            total_new += len(new_articles)
+        # Crawl and embed once, then fan the batch out to every user
+        articles, embeddings = await crawl_and_embed()
+        # Keep the shared search corpus (global.index) growing from the same batch
+        global_new = await deduplicate_articles(articles, embeddings)
+        logger.info(f"Added {len(global_new)} new articles to the search corpus")
+        results = await _for_each_user(
+            [str(user_id) for user_id in user_ids],
+            lambda user_id: deduplicate_articles_for_user(user_id, articles, embeddings)
+        )
+        total_new = sum(len(r) for r in results if r)
         logger.info(f"Deduplicated {total_new} new articles userwise")
     except Exception as e:
         logger.error(f"Deduplication failed: {str(e)}")
 
 @scheduler.scheduled_job('interval', hours=12)
+@profiled("periodic_cleanup")
 async def periodic_cleanup():
-    from utils.database import db
-    user_ids = await db.db.articles.distinct('user_id')
-    total_deleted = 0
-    for user_id in user_ids:
-        deleted = await delete_old_articles_for_user(user_id)
-        total_deleted += deleted
+    total_deleted = await delete_old_articles()
     logger.info(f"Deleted {total_deleted} old articles (older than 3 days)")
 
 async def run_verification_forever():
@@ -37,10 +54,31 @@ async def run_verification_forever():
         await asyncio.sleep(600)
 
 @scheduler.scheduled_job('interval', minutes=10)
+@profiled("periodic_verification")
 async def periodic_verification():
     await verify_unverified_articles_global()
 
-async def start_background_verification():
-    asyncio.create_task(run_verification_forever())
-    scheduler.start()
+_verification_task = None
+
+def _start_jobs():
+    global _verification_task
+    _verification_task = asyncio.create_task(run_verification_forever())
+    if scheduler.running:
+        scheduler.resume()
+    else:
+        scheduler.start()
     logger.info("Background verification started.")
+
+def _stop_jobs():
+    global _verification_task
+    if _verification_task is not None:
+        _verification_task.cancel()
+        _verification_task = None
+    if scheduler.running:
+        # Jobs already running finish, nothing new is scheduled until re-elected
+        scheduler.pause()
+    logger.info("Background verification paused, serving API traffic only.")
+
+async def start_background_verification():
+    # Every worker of every replica calls this; only the lease holder runs the jobs
+    leader.start(on_elected=_start_jobs, on_demoted=_stop_jobs)
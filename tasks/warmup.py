@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from config import Config
+from utils.database import db
+from utils.faiss_manager import faiss_manager
+from utils.startup import startup
+from utils import content_codec
+
+logger = logging.getLogger(__name__)
+
+def _preload_indexes():
+    for name in filter(None, (n.strip() for n in Config.WARMUP_INDEXES.split(","))):
+        faiss_manager.get_index(name)
+
+async def warmup():
+    """Connect to Mongo, load the model and hot indexes, then start background jobs.
+
+    Runs after the server is already accepting requests; /readyz reports ready
+    only once this finishes. Failed steps are retried until they succeed.
+    """
+    from services.recommender import embed_texts
+    from tasks.background import start_background_verification
+    loop = asyncio.get_running_loop()
+    steps = [
+        ("mongo", _connect),
+        ("model", lambda: loop.run_in_executor(None, embed_texts, ["warmup"])),
+        ("faiss", lambda: loop.run_in_executor(None, _preload_indexes)),
+        ("background_jobs", start_background_verification),
+    ]
+    for name, step in steps:
+        while True:
+            try:
+                with startup.phase(name):
+                    await step()
+                break
+            except Exception as e:
+                startup.error = f"{name}: {str(e)}"
+                logger.error(f"Warmup step {name} failed, retrying in {Config.WARMUP_RETRY_SECONDS}s: {str(e)}")
+                await asyncio.sleep(Config.WARMUP_RETRY_SECONDS)
+    startup.error = None
+    startup.ready = True
+    startup.log()
+
+async def _connect():
+    await db.ping()
+    await db.create_indexes()
+    await content_codec.load_dictionaries()
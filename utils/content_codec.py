@@ -0,0 +1,116 @@
+import logging
+import struct
+import threading
+import zlib
+from bson.binary import Binary
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Scraped article bodies can be stored compressed in `content_z`:
+#
+#   1 byte codec id | 4-byte little-endian dictionary id (0 = none) | compressed UTF-8
+#
+# zlib is always available; zstd needs the optional `zstandard` package. Both
+# can use a shared dictionary trained on our corpus
+# (scripts/train_content_dictionary.py), kept in the content_dictionaries
+# collection: {"_id": int, "codec": "zlib" | "zstd", "data": bytes, "created_at": datetime}.
+# New writes use the newest dictionary for CONTENT_CODEC; old blobs name their
+# own dictionary, so retraining never breaks reads. Decoding is synchronous, so
+# async readers await ensure_dictionaries(docs) first to fetch dictionaries
+# trained after this process loaded its cache.
+
+CODECS = {"zlib": 1, "zstd": 2}
+_NAMES = {v: k for k, v in CODECS.items()}
+_HEADER = struct.Struct("<BI")
+
+_dictionaries = {}
+_current = {}
+_lock = threading.Lock()
+
+def _zstd():
+    import zstandard
+    return zstandard
+
+def _remember(doc):
+    _dictionaries[doc["_id"]] = bytes(doc["data"])
+    if doc["_id"] > _current.get(doc["codec"], 0):
+        _current[doc["codec"]] = doc["_id"]
+
+def register_dictionary(doc):
+    """Cache a dictionary document (e.g. one just trained); new writes for its codec use it if newest."""
+    with _lock:
+        _remember(doc)
+
+async def load_dictionaries(ids=None):
+    """Cache trained dictionaries not loaded yet (only `ids` if given); called during warmup and per crawl."""
+    from utils.database import db
+    wanted = {"$in": list(ids)} if ids is not None else {"$nin": list(_dictionaries)}
+    docs = await db.db.content_dictionaries.find({"_id": wanted}).to_list(length=None)
+    with _lock:
+        for doc in docs:
+            _remember(doc)
+    return len(docs)
+
+def _dictionary_id(value) -> int:
+    return _HEADER.unpack_from(value)[1]
+
+async def ensure_dictionaries(articles, field: str = "content_z"):
+    """Load the dictionaries these documents' compressed content needs before decoding."""
+    needed = {_dictionary_id(a[field]) for a in articles if a and a.get(field)}
+    missing = needed - set(_dictionaries) - {0}
+    if missing:
+        await load_dictionaries(missing)
+
+def _dictionary(dict_id: int) -> bytes:
+    if dict_id not in _dictionaries:
+        raise ValueError(f"Content dictionary {dict_id} is not loaded (unknown id, or ensure_dictionaries() was not awaited)")
+    return _dictionaries[dict_id]
+
+def enabled() -> bool:
+    return Config.CONTENT_CODEC in CODECS
+
+def encode_content(text: str, codec: str = None) -> Binary:
+    codec = codec or Config.CONTENT_CODEC
+    raw = (text or "").encode("utf-8")
+    dict_id = _current.get(codec, 0)
+    if codec == "zstd":
+        zstd = _zstd()
+        dictionary = zstd.ZstdCompressionDict(_dictionaries[dict_id]) if dict_id else None
+        payload = zstd.ZstdCompressor(level=Config.CONTENT_LEVEL, dict_data=dictionary).compress(raw)
+    else:
+        compressor = zlib.compressobj(Config.CONTENT_LEVEL, zdict=_dictionaries[dict_id]) if dict_id else zlib.compressobj(Config.CONTENT_LEVEL)
+        payload = compressor.compress(raw) + compressor.flush()
+    return Binary(_HEADER.pack(CODECS[codec], dict_id) + payload)
+
+def decode_content(value) -> str:
+    if value is None:
+        return None
+    codec_id, dict_id = _HEADER.unpack_from(value)
+    payload = bytes(value[_HEADER.size:])
+    if _NAMES[codec_id] == "zstd":
+        zstd = _zstd()
+        dictionary = zstd.ZstdCompressionDict(_dictionary(dict_id)) if dict_id else None
+        raw = zstd.ZstdDecompressor(dict_data=dictionary).decompress(payload)
+    else:
+        decompressor = zlib.decompressobj(zdict=_dictionary(dict_id)) if dict_id else zlib.decompressobj()
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    return raw.decode("utf-8")
+
+def article_content(article) -> str:
+    """Full body of an article document, whether stored plain or compressed."""
+    if article.get("content") is not None:
+        return article["content"]
+    return decode_content(article.get("content_z"))
+
+def prepare_content(article: dict) -> dict:
+    """Copy of a crawled article with content_preview and (if enabled) content_z added.
+
+    Done once per crawl batch so every user copy reuses the same compressed blob.
+    """
+    article = dict(article)
+    content = article.get("content") or ""
+    article["content_preview"] = content[:Config.PREVIEW_CHARS]
+    if enabled():
+        article["content_z"] = encode_content(content)
+    return article
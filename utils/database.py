@@ -1,28 +1,61 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from config import Config
+from utils.metrics import MongoCommandMetrics
 from datetime import datetime
-print("MONGO_URI:", Config.MONGO_URI)
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 class Database:
+    """Mongo handle whose client is created on first use rather than at import."""
+
     def __init__(self):
-        self.client = AsyncIOMotorClient(Config.MONGO_URI)
-        self.db = self.client[Config.MONGO_DB_NAME]
-        self.articles = self.db.articles
-        self.users = self.db.users
-        self.news_sessions = self.db.news_sessions
-    
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = AsyncIOMotorClient(Config.MONGO_URI, event_listeners=[MongoCommandMetrics()])
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[Config.MONGO_DB_NAME]
+
+    @property
+    def articles(self):
+        return self.db.articles
+
+    @property
+    def users(self):
+        return self.db.users
+
+    @property
+    def news_sessions(self):
+        return self.db.news_sessions
+
+    async def ping(self):
+        await self.client.admin.command("ping")
+
     async def create_indexes(self):
-        await self.db.articles.create_index([("category", 1), ("published", -1)])
-        await self.db.user_reads.create_index([("user_id", 1), ("article_id", 1)])
+        from utils.indexes import INDEXES
+        for collection, indexes in INDEXES.items():
+            for keys, options in indexes:
+                try:
+                    await self.db[collection].create_index(keys, **options)
+                except Exception as e:
+                    # e.g. duplicates blocking a unique index, keep starting up
+                    logger.error(f"Could not create index {keys} on {collection}: {str(e)}")
 
-    def update_last_active(self):
-        self.db.heartbeat.update_one(
+    async def update_last_active(self, when: datetime = None):
+        await self.db.heartbeat.update_one(
             {"_id": "trueshorts-backend"},
-            {"$set": {"last_active": datetime.utcnow()}},
+            {"$max": {"last_active": when or datetime.utcnow()}},
             upsert=True
         )
 
 db = Database()
-
-def update_last_active():
-    db.update_last_active()
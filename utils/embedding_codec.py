@@ -0,0 +1,47 @@
+import struct
+import numpy as np
+from bson.binary import Binary
+from config import Config
+
+# Embeddings are stored as a packed BSON binary instead of an array of doubles:
+#
+#   1 byte codec id | int8 only: 4-byte float32 scale | little-endian values
+#
+# float32 decodes zero-copy with np.frombuffer; float16 and int8 trade a little
+# precision for 2x/4x smaller documents. Legacy float lists still decode.
+
+CODECS = {"f32": 1, "f16": 2, "i8": 3}
+_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f2"), 3: np.dtype("i1")}
+_SCALE = struct.Struct("<f")
+
+def encode_embedding(vector, codec: str = None) -> Binary:
+    codec_id = CODECS[codec or Config.EMBEDDING_CODEC]
+    values = np.asarray(vector, dtype=np.float32).ravel()
+    if codec_id == 3:
+        scale = float(np.abs(values).max()) / 127 or 1.0
+        quantized = np.clip(np.rint(values / scale), -127, 127).astype(_DTYPES[3])
+        return Binary(bytes([codec_id]) + _SCALE.pack(scale) + quantized.tobytes())
+    return Binary(bytes([codec_id]) + values.astype(_DTYPES[codec_id]).tobytes())
+
+def decode_embedding(value) -> np.ndarray:
+    """Return a float32 vector; read-only when it is a zero-copy view."""
+    if value is None:
+        return None
+    if not isinstance(value, (bytes, bytearray)):
+        return np.asarray(value, dtype=np.float32)
+    codec_id = value[0]
+    if codec_id == 3:
+        (scale,) = _SCALE.unpack_from(value, 1)
+        return np.frombuffer(value, dtype=_DTYPES[3], offset=1 + _SCALE.size).astype(np.float32) * np.float32(scale)
+    vector = np.frombuffer(value, dtype=_DTYPES[codec_id], offset=1)
+    return vector if codec_id == 1 else vector.astype(np.float32)
+
+def decode_embeddings(values) -> np.ndarray:
+    """Stack many stored embeddings into one float32 matrix."""
+    if not values:
+        return np.zeros((0, 384), dtype=np.float32)
+    return np.vstack([decode_embedding(v) for v in values])
+
+def embedding_to_list(value):
+    vector = decode_embedding(value)
+    return vector.tolist() if vector is not None else None
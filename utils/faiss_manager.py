@@ -4,6 +4,7 @@ import os
 from config import Config
 from functools import lru_cache
 import threading
+from utils.metrics import track, set_index_size
 
 class FAISSManager:
     def __init__(self):
@@ -15,16 +16,31 @@ class FAISSManager:
             if path not in self._indices:
                 full_path = os.path.join(Config.FAISS_INDEX_DIR, path)
                 if os.path.exists(full_path):
-                    self._indices[path] = faiss.read_index(full_path)
+                    with track("faiss_load"):
+                        self._indices[path] = faiss.read_index(full_path)
+                    # FAISS_HNSW_EF_SEARCH overrides the efSearch saved in the index file
+                    set_ef_search(self._indices[path], Config.FAISS_HNSW_EF_SEARCH)
                 else:
-                    index = faiss.IndexHNSWFlat(384, 32)
-                    index.hnsw.efSearch = 64
+                    index = faiss.IndexHNSWFlat(384, Config.FAISS_HNSW_M)
+                    index.hnsw.efSearch = Config.FAISS_HNSW_EF_SEARCH
                     self._indices[path] = faiss.IndexIDMap(index)
+                set_index_size(path, self._indices[path])
             return self._indices[path]
     
     def save_index(self, path: str, index):
         full_path = os.path.join(Config.FAISS_INDEX_DIR, path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        faiss.write_index(index, full_path)
+        with track("faiss_save"):
+            faiss.write_index(index, full_path)
+        set_index_size(path, index)
+
+def set_ef_search(index, ef_search: int):
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if hasattr(inner, "hnsw"):
+        inner.hnsw.efSearch = ef_search
 
 faiss_manager = FAISSManager()
+
+def faiss_id(object_id) -> int:
+    # FAISS ids are int64, derived from the Mongo ObjectId
+    return int(object_id.binary.hex(), 16) % (2**63)
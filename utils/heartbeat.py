@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from datetime import datetime
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class Heartbeat:
+    """Records API activity in memory and flushes it to Mongo at most once per interval.
+
+    Requests only call touch(); the background task writes last_active with
+    $max so replicas sharing the heartbeat document never move it backwards.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_seen = None
+        self.last_flushed = None
+        self.last_flush_at = None
+        self.last_flush_error = None
+        self._task = None
+
+    def touch(self):
+        self.last_seen = datetime.utcnow()
+
+    async def flush(self):
+        seen = self.last_seen
+        if seen is None or seen == self.last_flushed:
+            return
+        from utils.database import db
+        try:
+            await db.update_last_active(seen)
+            self.last_flushed = seen
+            self.last_flush_error = None
+        except Exception as e:
+            self.last_flush_error = str(e)
+            logger.error(f"Heartbeat flush failed: {str(e)}")
+        self.last_flush_at = datetime.utcnow()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "last_seen": self.last_seen,
+            "last_flush_at": self.last_flush_at,
+            "last_flush_error": self.last_flush_error,
+        }
+
+heartbeat = Heartbeat(Config.HEARTBEAT_FLUSH_SECONDS)
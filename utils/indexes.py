@@ -0,0 +1,65 @@
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, TEXT
+from config import Config
+
+# Every hot query shape and the index that serves it. Database.create_indexes()
+# builds INDEXES at startup; scripts/explain_queries.py runs explain() on each
+# QUERY_SHAPES entry and flags collection scans.
+
+INDEXES = {
+    "articles": [
+        # Feed ranking and fallback: {user_id, seen} newest first
+        ([("user_id", ASCENDING), ("seen", ASCENDING), ("published", DESCENDING)], {}),
+        # Per-user verification: {user_id, verified}
+        ([("user_id", ASCENDING), ("verified", ASCENDING)], {}),
+        # Global verification: {verified: False} newest first
+        ([("verified", ASCENDING), ("published", DESCENDING)], {}),
+        # Cleanup: fetched_at range deletes
+        ([("fetched_at", ASCENDING)], {}),
+        ([("category", ASCENDING), ("published", DESCENDING)], {}),
+        # Search: keyword mode over the global corpus and mapping global.index hits back to articles.
+        # Replacing the older full text index needs a one-off db.articles.dropIndex("article_text").
+        ([("title", TEXT), ("content", TEXT)], {
+            "weights": {"title": 5, "content": 1},
+            "name": "article_text",
+            "partialFilterExpression": {"faiss_id": {"$exists": True}}
+        }),
+        ([("faiss_id", ASCENDING)], {"sparse": True}),
+    ],
+    "user_reads": [
+        ([("user_id", ASCENDING), ("article_id", ASCENDING)], {}),
+    ],
+    "saved_articles": [
+        ([("user_id", ASCENDING), ("article_id", ASCENDING)], {"unique": True}),
+        # Saved list pages: {user_id} by (saved_at, _id) newest first
+        ([("user_id", ASCENDING), ("saved_at", DESCENDING), ("_id", DESCENDING)], {}),
+    ],
+    "users": [
+        ([("email", ASCENDING)], {"unique": True}),
+    ],
+    "news_sessions": [
+        ([("session_id", ASCENDING)], {"unique": True}),
+        ([("last_accessed", ASCENDING)], {"expireAfterSeconds": 600}),
+    ],
+    "news_agent_cache": [
+        ([("created_at", ASCENDING)], {"expireAfterSeconds": Config.NEWS_AGENT_CACHE_TTL}),
+    ],
+}
+
+# name, collection, filter, sort (None for unsorted). Values only need the right types.
+QUERY_SHAPES = [
+    ("feed ranking candidates", "articles",
+     {"user_id": "u", "seen": False, "$or": [{"verified": True}, {"verified": False}]}, [("published", -1)]),
+    ("feed fallback newest unseen", "articles", {"user_id": "u", "seen": False}, [("published", -1)]),
+    ("per-user verification", "articles", {"user_id": "u", "verified": {"$ne": True}}, None),
+    ("global verification", "articles", {"verified": False}, [("published", -1)]),
+    ("cleanup by fetched_at", "articles", {"user_id": {"$ne": None}, "fetched_at": {"$lt": "cutoff"}, "saved": {"$ne": True}}, None),
+    ("search semantic hits", "articles", {"faiss_id": {"$in": [1, 2, 3]}}, None),
+    ("user read history", "user_reads", {"user_id": "u"}, None),
+    ("saved article lookup", "saved_articles", {"user_id": "u", "article_id": "a"}, None),
+    ("saved articles page", "saved_articles",
+     {"user_id": "u", "$or": [{"saved_at": {"$lt": datetime(2024, 1, 1)}}, {"saved_at": datetime(2024, 1, 1), "_id": {"$lt": "id"}}]},
+     [("saved_at", -1), ("_id", -1)]),
+    ("login by email", "users", {"email": "user@example.com"}, None),
+    ("news session lookup", "news_sessions", {"session_id": "s"}, None),
+]
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import Config
+from utils.database import db
+
+logger = logging.getLogger(__name__)
+
+# Mongo lease for leader election across workers and containers:
+#
+#   leases: {"_id": name, "holder": instance_id, "expires_at": datetime, "renewed_at": datetime}
+#
+# Every process tries to take or renew the lease every LEADER_RENEW_SECONDS. The
+# lease is taken only when it is free, expired or already ours, so exactly one
+# process holds it; if the leader dies it is taken over after LEADER_LEASE_SECONDS.
+# A leader that cannot renew steps down once its own lease would have expired.
+
+class LeaderElection:
+    def __init__(self, name: str, lease_seconds: float, renew_seconds: float):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._expires_at = None
+        self._on_elected = None
+        self._on_demoted = None
+        self._task = None
+
+    async def try_acquire(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            lease = await db.db.leases.find_one_and_update(
+                {"_id": self.name, "$or": [{"holder": self.instance_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": {
+                    "holder": self.instance_id,
+                    "expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "renewed_at": now,
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The upsert raced with a live lease held by someone else
+            return False
+        if lease and lease["holder"] == self.instance_id:
+            self._expires_at = lease["expires_at"]
+            return True
+        return False
+
+    async def release(self):
+        if self.is_leader:
+            await db.db.leases.delete_one({"_id": self.name, "holder": self.instance_id})
+            self._set_leader(False)
+
+    def _set_leader(self, leader: bool):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        logger.info(f"{self.instance_id} {'acquired' if leader else 'lost'} the {self.name} lease")
+        callback = self._on_elected if leader else self._on_demoted
+        if callback:
+            try:
+                callback()
+            except Exception:
+                logger.exception(f"Leader {'election' if leader else 'demotion'} callback failed")
+
+    async def _run(self):
+        while True:
+            try:
+                self._set_leader(await self.try_acquire())
+            except Exception as e:
+                logger.error(f"Lease renewal for {self.name} failed: {str(e)}")
+                if self.is_leader and (self._expires_at is None or datetime.utcnow() >= self._expires_at):
+                    # Someone else may hold the lease by now, stop acting as leader
+                    self._set_leader(False)
+            await asyncio.sleep(self.renew_seconds)
+
+    def start(self, on_elected=None, on_demoted=None):
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            # Hand over right away instead of waiting for the lease to expire
+            await self.release()
+        except Exception as e:
+            logger.error(f"Could not release the {self.name} lease: {str(e)}")
+
+leader = LeaderElection("background-jobs", Config.LEADER_LEASE_SECONDS, Config.LEADER_RENEW_SECONDS)
@@ -0,0 +1,101 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from langchain_core.callbacks import BaseCallbackHandler
+from pymongo import monitoring
+
+# Process-wide Prometheus metrics, exposed on GET /metrics. Everything here is
+# an in-memory counter or bucket increment, cheap enough to leave on.
+#
+#   trueshorts_stage_seconds{stage}            crawl / extract / embed / faiss / rank / verification stages
+#   trueshorts_http_request_seconds{...}       per-endpoint latency from the app middleware
+#   trueshorts_mongo_command_seconds{command}  every Mongo command via pymongo command monitoring
+#   trueshorts_llm_call_seconds{model,outcome} every chat model call via a LangChain callback
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = Histogram("trueshorts_stage_seconds", "Time spent per pipeline stage", ["stage"], buckets=LATENCY_BUCKETS)
+STAGE_ERRORS = Counter("trueshorts_stage_errors_total", "Pipeline stages that raised", ["stage"])
+HTTP_SECONDS = Histogram("trueshorts_http_request_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+HTTP_IN_FLIGHT = Gauge("trueshorts_http_requests_in_flight", "HTTP requests currently being served")
+MONGO_SECONDS = Histogram("trueshorts_mongo_command_seconds", "Mongo command latency", ["command"], buckets=LATENCY_BUCKETS)
+MONGO_ERRORS = Counter("trueshorts_mongo_command_errors_total", "Failed Mongo commands", ["command"])
+LLM_SECONDS = Histogram("trueshorts_llm_call_seconds", "LLM call latency", ["model", "outcome"], buckets=LATENCY_BUCKETS)
+ARTICLES_FETCHED = Counter("trueshorts_articles_fetched_total", "Articles fetched from upstream sources", ["source"])
+ARTICLES_INGESTED = Counter("trueshorts_articles_ingested_total", "Articles inserted after deduplication", ["scope"])
+TEXTS_EMBEDDED = Counter("trueshorts_texts_embedded_total", "Texts passed through the embedding model")
+CACHE_LOOKUPS = Counter("trueshorts_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+FAISS_VECTORS = Gauge("trueshorts_faiss_index_vectors", "Vectors in each loaded FAISS index", ["index"])
+
+@contextmanager
+def track(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+def timed(stage: str):
+    """Decorator recording the wrapped function (sync or async) under `stage`."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with track(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def set_index_size(name: str, index):
+    FAISS_VECTORS.labels(name).set(index.ntotal)
+
+def latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_ERRORS.labels(event.command_name).inc()
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Times every chat model call, including the ones made inside agents."""
+
+    run_inline = True
+
+    def __init__(self, model: str):
+        self.model = model
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id, outcome: str):
+        start = self._started.pop(run_id, None)
+        if start is not None:
+            LLM_SECONDS.labels(self.model, outcome).observe(time.perf_counter() - start)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "ok")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error")
@@ -1,4 +1,7 @@
 from bson import ObjectId
+from config import Config
+from utils.content_codec import article_content
+from utils.embedding_codec import embedding_to_list
 
 def to_json_serializable(obj):
     """
@@ -13,3 +16,67 @@ def to_json_serializable(obj):
         return [to_json_serializable(item) for item in obj]
     else:
         return obj
+
+# Public article fields, as exposed by ArticleOut
+ARTICLE_FIELDS = (
+    "article_id", "title", "content", "preview", "category", "published", "source", "url", "user_id",
+    "embedding", "fetched_at", "seen", "verified", "verdict", "explanation"
+)
+
+# Returned unless the client asks otherwise: no embedding, and a content preview
+# instead of the full scraped body
+LEAN_FIELDS = tuple(f for f in ARTICLE_FIELDS if f not in ("content", "embedding"))
+
+def _split(value):
+    return [f.strip() for f in value.split(",") if f.strip()] if value else []
+
+def parse_fields(fields=None, include=None, default=LEAN_FIELDS):
+    """Resolve `fields` (exact selection) or `include` (extras on top of the default)."""
+    requested = _split(fields) or list(default) + [f for f in _split(include) if f not in default]
+    unknown = [f for f in requested if f not in ARTICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def article_projection(fields, prefix=""):
+    """Mongo projection loading only what the requested fields need.
+
+    `preview` is truncated server-side so the full content never leaves Mongo.
+    """
+    projection = {}
+    for field in fields:
+        if field == "article_id":
+            projection[f"{prefix}_id"] = 1
+        elif field == "preview":
+            # Aggregation expressions in find projections need MongoDB 4.4+.
+            # A stored preview (saved snapshots, content_preview) wins over truncating content.
+            source = {"$ifNull": [f"${prefix}content_preview", {"$ifNull": [f"${prefix}content", ""]}]}
+            projection[f"{prefix}preview"] = {
+                "$substrCP": [{"$ifNull": [f"${prefix}preview", source]}, 0, Config.PREVIEW_CHARS]
+            }
+        elif field == "content":
+            # Compressed copies keep the body in content_z, decoded by article_to_out
+            projection[f"{prefix}content"] = 1
+            projection[f"{prefix}content_z"] = 1
+        else:
+            projection[f"{prefix}{field}"] = 1
+    return projection
+
+def article_to_out(article, fields):
+    """Map an article document to a dict with only the requested public fields."""
+    out = {}
+    for field in fields:
+        if field == "article_id":
+            article_id = article.get("_id")
+            out["article_id"] = str(article_id) if article_id is not None else None
+        elif field == "preview":
+            out["preview"] = (article.get("preview") or article.get("content_preview") or article.get("content") or "")[:Config.PREVIEW_CHARS]
+        elif field == "content":
+            out["content"] = article_content(article)
+        elif field == "embedding":
+            out["embedding"] = embedding_to_list(article.get("embedding"))
+        elif field in ("seen", "verified"):
+            out[field] = article.get(field, False)
+        else:
+            out[field] = article.get(field)
+    return out
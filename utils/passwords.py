@@ -0,0 +1,34 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from config import Config
+
+# bcrypt costs 100-300 ms of CPU per call. The bcrypt backend releases the GIL,
+# so hashing in a bounded thread pool keeps the event loop free and lets login
+# throughput scale with cores. Hashes made with a different cost factor than
+# BCRYPT_ROUNDS are flagged by verify_password so the caller can rehash them.
+
+# min and max are pinned explicitly (not left to passlib's rounds fallback) so
+# verify_and_update flags hashes made at any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=Config.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=Config.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=Config.BCRYPT_ROUNDS
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="bcrypt"
+)
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, pwd_context.hash, password)
+
+async def verify_password(password: str, hashed: str):
+    """Return (valid, new_hash); new_hash is set when the stored hash should be upgraded."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, pwd_context.verify_and_update, password, hashed)
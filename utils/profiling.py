@@ -0,0 +1,91 @@
+import asyncio
+import functools
+import hmac
+import logging
+import os
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Opt-in wall-clock profiles of single requests or background jobs.
+#
+# A request is profiled when it carries the admin token (X-Profile-Token header
+# or ?profile=<token>) or is picked by PROFILE_SAMPLE_RATE; jobs wrapped with
+# @profiled(name) are profiled when listed in PROFILE_JOBS ("*" for all) or
+# sampled. pyinstrument's async mode only records the profiled task and the
+# tasks it spawns, so concurrent requests are unaffected. Profiles are written
+# to PROFILE_DIR as speedscope JSON (open at https://www.speedscope.app).
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY = "profile"
+_PROFILE_ID = re.compile(r"^[\w.-]+\.speedscope\.json$")
+
+def authorized(token: str) -> bool:
+    return bool(Config.PROFILING_TOKEN and token) and hmac.compare_digest(token, Config.PROFILING_TOKEN)
+
+def _sampled() -> bool:
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+def should_profile_request(request) -> bool:
+    if request.url.path.startswith("/profiles/"):
+        # Downloading a profile carries the token too, never profile that
+        return False
+    token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY)
+    return authorized(token) or _sampled()
+
+def should_profile_job(name: str) -> bool:
+    jobs = {j.strip() for j in Config.PROFILE_JOBS.split(",") if j.strip()}
+    return "*" in jobs or name in jobs or _sampled()
+
+def profile_path(profile_id: str) -> str:
+    if not _PROFILE_ID.match(profile_id):
+        raise ValueError("Invalid profile id")
+    return os.path.join(Config.PROFILE_DIR, profile_id)
+
+def _write(profiler, profile_id: str):
+    from pyinstrument.renderers import SpeedscopeRenderer
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w") as f:
+        f.write(profiler.output(SpeedscopeRenderer()))
+
+@asynccontextmanager
+async def profile(name: str):
+    """Profile the enclosed block; yields a dict whose "id" is set once the profile is stored."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning("pyinstrument is not installed, profiling disabled")
+        yield {"id": None}
+        return
+    result = {"id": None}
+    profiler = Profiler(interval=Config.PROFILE_INTERVAL, async_mode="enabled")
+    profiler.start()
+    try:
+        yield result
+    finally:
+        profiler.stop()
+        slug = re.sub(r"[^\w.-]+", "_", name).strip("_") or "profile"
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{random.getrandbits(32):08x}-{slug}.speedscope.json"
+        try:
+            # Rendering walks the whole call tree, keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, _write, profiler, profile_id)
+            result["id"] = profile_id
+            logger.info(f"Stored profile {profile_id}")
+        except Exception as e:
+            logger.error(f"Could not store profile for {name}: {str(e)}")
+
+def profiled(name: str):
+    """Decorator for background jobs, profiling runs selected by should_profile_job()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not should_profile_job(name):
+                return await fn(*args, **kwargs)
+            async with profile(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller starts the work as a task; callers arriving while it is
+    still running await the same task and share its result (or exception).
+    Cancelling one waiter does not cancel the shared work.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+class Broadcast:
+    """Fans the events of one streaming run out to every subscriber.
+
+    Events are kept so late subscribers replay what they missed; None marks
+    the end of the stream, after which `task` holds the run's result. `shared`
+    is set when a non-streaming caller is also waiting on `task`.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.task = None
+        self.shared = False
+        self._queues = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._queues)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._queues.discard(queue)
+
+    def publish(self, event):
+        self.events.append(event)
+        for queue in self._queues:
+            queue.put_nowait(event)
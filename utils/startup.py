@@ -0,0 +1,46 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Startup timing report. app.py imports this module first, so "imports" covers
+# every module the app pulls in; warmup phases are recorded as they finish.
+# Served on GET /readyz; use `python -X importtime -c "import app"` for a
+# per-module breakdown of the import phase.
+
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = {}
+        self.ready = False
+        self.error = None
+
+    def mark(self, name: str):
+        """Record the time since the previous mark (or process import) as a phase."""
+        now = time.perf_counter()
+        self.phases[name] = round(now - self._last, 4)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 4)
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "seconds_since_import": round(time.perf_counter() - self.started, 4),
+            "phases": dict(self.phases),
+            "error": self.error,
+        }
+
+    def log(self):
+        phases = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.phases.items())
+        logger.info(f"Startup report: ready={self.ready} {phases}")
+
+startup = StartupReport()
@@ -0,0 +1,26 @@
+import json
+import logging
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def _ndjson_lines(events: AsyncIterator[dict]):
+    try:
+        async for event in events:
+            yield json.dumps(event, default=str) + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.exception("Streaming response failed")
+        yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+def ndjson_response(events: AsyncIterator[dict]) -> StreamingResponse:
+    """Stream events as newline-delimited JSON, one object per line."""
+    return StreamingResponse(
+        _ndjson_lines(events),
+        media_type=NDJSON_MEDIA_TYPE,
+        # Stop reverse proxies from buffering the whole body
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )